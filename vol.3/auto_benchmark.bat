@@ -130,7 +130,7 @@ echo =========================================
 echo.
 
 echo Docker内でグラフを生成中...
-docker exec benchmark-client python3 /app/scripts/analyze_results.py %SESSION_DIR%
+docker exec benchmark-client python3 /app/scripts/analyze_client.py %SESSION_DIR%
 if %ERRORLEVEL% neq 0 (
     echo.
     echo [エラー] グラフ生成に失敗しました
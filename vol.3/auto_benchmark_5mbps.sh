@@ -81,7 +81,7 @@ echo "========================================="
 DOCKER_SESSION_PATH="/app/results/session_${SESSION_TIMESTAMP}_${SESSION_NAME}"
 
 echo "Docker内でグラフを生成中..."
-if docker exec benchmark-client python3 /app/scripts/analyze_results.py "$DOCKER_SESSION_PATH"; then
+if docker exec benchmark-client python3 /app/scripts/analyze_client.py "$DOCKER_SESSION_PATH"; then
     echo ""
     echo "========================================="
     echo "✅ すべて完了！"
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+analyze-server（analyze_results.py serve）への解析依頼クライアント
+pandas等を読み込まずに起動できるよう標準ライブラリだけを使う。サーバーに接続できない場合は
+同じ引数で analyze_results.py を実行する
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+
+# analyze_results.py の DEFAULT_SERVER_SOCKET と同じ
+DEFAULT_SERVER_SOCKET = '/tmp/analyze_results.sock'
+ANALYZE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analyze_results.py')
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description='起動中のanalyze-serverにセッションの解析を依頼する')
+    parser.add_argument('results_dir', help='セッションディレクトリ（session_XXX）')
+    parser.add_argument('--socket', default=DEFAULT_SERVER_SOCKET, help=f'analyze-serverのソケット（デフォルト: {DEFAULT_SERVER_SOCKET}）')
+    parser.add_argument('--quality', default='publication', help='グラフの描画品質（デフォルト: publication）')
+    parser.add_argument('--stages', nargs='+', default=['consolidate', 'export', 'reports', 'graphs'], help='実行する段階（デフォルト: 全て）')
+    parser.add_argument('--reports-only', action='store_true', help='テキストレポートのみを生成する')
+    parser.add_argument('--force', action='store_true', help='全てのグラフ・レポートを再生成する')
+    parser.add_argument('--no-cache', action='store_true', help='読み込みキャッシュを使わずに全CSVを再解析する')
+    return parser.parse_args(argv)
+
+def request_analysis(args):
+    """解析を依頼して応答を返す（サーバーに接続できない場合はNone）"""
+    stages = [stage for stage in args.stages if stage != 'graphs'] if args.reports_only else args.stages
+    request = {'results_dir': os.path.abspath(args.results_dir), 'stages': stages, 'quality': args.quality,
+               'force': args.force, 'cache': not args.no_cache}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(args.socket)
+        except OSError:
+            return None
+        # 改行区切りのJSONで1往復する
+        client.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+        chunks = []
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if chunk.endswith(b'\n'):
+                break
+    return json.loads(b''.join(chunks).decode('utf-8'))
+
+def main():
+    argv = sys.argv[1:]
+    args = parse_args(argv)
+    response = request_analysis(args)
+    if response is None:
+        # サーバーが起動していなければこのプロセスで解析する（--socket 以外の引数はそのまま渡す）
+        print(f"Analyze server is not running on {args.socket}, running analyze_results.py")
+        forwarded = [arg for i, arg in enumerate(argv)
+                     if arg != '--socket' and not arg.startswith('--socket=') and (i == 0 or argv[i - 1] != '--socket')]
+        sys.stdout.flush()
+        os.execv(sys.executable, [sys.executable, ANALYZE_SCRIPT] + forwarded)
+    
+    print(response['output'], end='')
+    print(f"Analyzed by server in {response['seconds']:.2f}s")
+    sys.exit(0 if response['ok'] else 1)
+
+if __name__ == '__main__':
+    main()
@@ -4,46 +4,132 @@
 """
 
 import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # 非表示バックエンド
-import matplotlib.pyplot as plt
 import numpy as np
+import argparse
+import contextlib
 import glob
+import hashlib
+import importlib.util
+import io
+import json
 import os
 import sys
+import time
+import tracemalloc
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from scipy.interpolate import make_interp_spline
-from scipy.signal import savgol_filter
-
-# 日本語フォント設定
-# Dockerコンテナ内で利用可能なフォントを優先的に使用
-import matplotlib.font_manager as fm
-
-# 利用可能な日本語フォントを検索
-try:
-    available_fonts = [f.name for f in fm.fontManager.ttflist]
-    japanese_fonts = []
-    
-    # Notoフォントを優先的に検索
-    preferred_fonts = ['Noto Sans CJK JP', 'Noto Sans CJK', 'Noto Sans', 'DejaVu Sans']
-    for font_name in preferred_fonts:
-        if font_name in available_fonts:
-            japanese_fonts.append(font_name)
-            break
+
+# matplotlibとscipyは読み込みに時間がかかるため、グラフを生成するときに初めて読み込む
+# （--reports-only ではテキストレポートのみを生成し、どちらも読み込まない）
+plt = None
+make_interp_spline = None
+savgol_filter = None
+
+FONT_CACHE_FILE = 'analyze_results_fonts.json'
+PREFERRED_FONTS = ['Noto Sans CJK JP', 'Noto Sans CJK', 'Noto Sans', 'DejaVu Sans']
+JAPANESE_FONTS = ('Noto Sans CJK JP', 'Noto Sans CJK')
+
+def font_directories_signature():
+    """フォントディレクトリ（と直下のサブディレクトリ）のmtime（フォントの追加・削除で変わる）"""
+    import matplotlib
+    import matplotlib.font_manager as fm
+    font_dirs = list(fm.X11FontDirectories) + list(fm.OSXFontDirectories)
+    font_dirs.append(os.path.join(matplotlib.get_data_path(), 'fonts', 'ttf'))
+    
+    signature = {}
+    for font_dir in font_dirs:
+        if not os.path.isdir(font_dir):
+            continue
+        signature[font_dir] = os.stat(font_dir).st_mtime_ns
+        for entry in os.scandir(font_dir):
+            if entry.is_dir():
+                signature[entry.path] = entry.stat().st_mtime_ns
+    return signature
+
+def resolve_japanese_fonts():
+    """使用する日本語フォントを決める（フォントディレクトリが変わっていなければ前回の結果を使う）"""
+    import matplotlib
+    cache_path = os.path.join(matplotlib.get_cachedir(), FONT_CACHE_FILE)
+    signature = font_directories_signature()
+    
+    japanese_fonts = None
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('signature') == signature and cached.get('fonts'):
+            japanese_fonts = cached['fonts']
+    except (OSError, ValueError):
+        pass
+    
+    if japanese_fonts is None:
+        # 利用可能な日本語フォントを検索（Notoフォントを優先）
+        import matplotlib.font_manager as fm
+        available_fonts = {f.name for f in fm.fontManager.ttflist}
+        japanese_fonts = [font_name for font_name in PREFERRED_FONTS if font_name in available_fonts][:1]
+        
+        # フォントが見つからない場合はデフォルトを使用
+        if not japanese_fonts:
+            japanese_fonts = ['DejaVu Sans']
+        
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'signature': signature, 'fonts': japanese_fonts}, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"Warning: Failed to write {cache_path}: {e}")
+    
+    if japanese_fonts[0] not in JAPANESE_FONTS:
+        print(f"Warning: Japanese font (Noto Sans CJK JP) not found, using {japanese_fonts[0]} (Japanese labels may not render)")
+    return japanese_fonts
+
+def load_plotting():
+    """matplotlibとscipyを読み込み、日本語フォントを設定する（2回目以降は何もしない）"""
+    global plt, make_interp_spline, savgol_filter
+    if plt is not None:
+        return
+    
+    import matplotlib
+    matplotlib.use('Agg')  # 非表示バックエンド
+    import matplotlib.pyplot as pyplot
+    from scipy.interpolate import make_interp_spline
+    from scipy.signal import savgol_filter
+    
+    # 日本語フォント設定
+    # Dockerコンテナ内で利用可能なフォントを優先的に使用
+    try:
+        pyplot.rcParams['font.sans-serif'] = resolve_japanese_fonts()
+    except Exception as e:
+        # エラーが発生した場合はデフォルトフォントを使用
+        pyplot.rcParams['font.sans-serif'] = ['DejaVu Sans']
+        print(f"Warning: Font configuration failed: {e}")
     
-    # フォントが見つからない場合はデフォルトを使用
-    if not japanese_fonts:
-        japanese_fonts = ['DejaVu Sans']
+    pyplot.rcParams['axes.unicode_minus'] = False
+    # 全体のデフォルトフォントを少し大きめにする
+    pyplot.rcParams['font.size'] = 15
     
-    plt.rcParams['font.sans-serif'] = japanese_fonts
-except Exception as e:
-    # エラーが発生した場合はデフォルトフォントを使用
-    plt.rcParams['font.sans-serif'] = ['DejaVu Sans']
-    print(f"Warning: Font configuration failed: {e}")
+    plt = pyplot
 
-plt.rcParams['axes.unicode_minus'] = False
-# 全体のデフォルトフォントを少し大きめにする
-plt.rcParams['font.size'] = 15
+# グラフの描画品質プロファイル（--quality）
+# preview: 確認用の低解像度PNG、publication: 論文・資料用のPNG（従来の出力）、vector: ラスタライズしないSVG
+RENDER_PROFILES = {
+    'preview': {'format': 'png', 'dpi': 100},
+    'publication': {'format': 'png', 'dpi': 300},
+    'vector': {'format': 'svg', 'dpi': 300},
+}
+DEFAULT_QUALITY = 'publication'
+
+def figure_filename(name, quality=DEFAULT_QUALITY):
+    """描画品質プロファイルに応じたグラフのファイル名"""
+    return f"{name}.{RENDER_PROFILES[quality]['format']}"
+
+def save_figure(output_dir, name, quality=DEFAULT_QUALITY):
+    """現在のグラフを描画品質プロファイルに従って保存し、保存先のパスを返す"""
+    output_file = os.path.join(output_dir, figure_filename(name, quality))
+    start = time.perf_counter()
+    plt.savefig(output_file, dpi=RENDER_PROFILES[quality]['dpi'],
+                bbox_inches='tight', facecolor='white', pad_inches=0.2)
+    add_profile_section('savefig', start)
+    return output_file
 
 # カラースキーム定義（画像デザイン準拠）
 COLORS = {
@@ -68,15 +154,141 @@ COLORS = {
     'background': '#FFFFFF',     # 背景色（白）
 }
 
-def load_results(results_dir):
-    """結果ファイルを読み込む（新しいディレクトリ構造対応）"""
+RESULT_FILENAMES = ('http2_results.csv', 'http3_results.csv')
+
+# 読み込み済みCSVの列指向キャッシュ（セッションディレクトリ内に保存）
+CACHE_DIRNAME = '.analysis_cache'
+RESULTS_CACHE_FILE = 'results_cache.parquet'
+RESULTS_CACHE_INDEX = 'results_cache.json'
+SOURCE_FILE_COLUMN = '_SourceFile'
+# 正規化処理を変更したらキャッシュを作り直すために上げる
+RESULTS_CACHE_VERSION = 3
+
+# 読み込み時に適用する列の型（metrics.go のCSVヘッダーに対応）
+RESULT_SCHEMA = {
+    'Protocol': 'category',
+    'TTFB(ms)': 'float32',
+    'TotalTime(ms)': 'float32',
+    'BytesReceived': 'int64',
+    'StatusCode': 'int16',
+    'Error': 'category',
+    'NetworkDelay(ms)': 'Int16',
+    'Bandwidth': 'category',
+    'Throughput(KB/s)': 'float32',
+    'BandwidthDir': 'category',
+    'ExtractedDelay': 'Int16',
+}
+
+# metrics.go のCSVヘッダー（benchmark_results.csv はこの列だけを書き出す）
+RESULT_CSV_COLUMNS = ['Protocol', 'RequestTime', 'TTFB(ms)', 'TotalTime(ms)', 'BytesReceived',
+                      'StatusCode', 'Error', 'NetworkDelay(ms)', 'Bandwidth', 'Throughput(KB/s)']
+
+# 結果CSVの読み込み方法（pyarrow: Arrowのマルチスレッドパーサー、pandas: pd.read_csv、auto: pyarrowがあればpyarrow）
+CSV_READERS = ('auto', 'pyarrow', 'pandas')
+DEFAULT_CSV_READER = 'auto'
+
+def _pyarrow_available():
+    """pyarrow（CSVパーサー・Parquetキャッシュ・Arrow IPCの書き出し）が使えるか"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+def arrow_column_types():
+    """metrics.go のCSVヘッダーに対応するArrowの列の型（CSVにない列は無視される）"""
+    import pyarrow as pa
+    category = pa.dictionary(pa.int32(), pa.string())
+    # 小数はpandasと同じ値になるようfloat64で読み、RESULT_SCHEMA の型への変換は共通の処理で行う
+    return {
+        'Protocol': category,
+        'RequestTime': pa.timestamp('ns', tz='UTC'),
+        'TTFB(ms)': pa.float64(),
+        'TotalTime(ms)': pa.float64(),
+        'BytesReceived': pa.int64(),
+        'StatusCode': pa.int16(),
+        'Error': category,
+        'NetworkDelay(ms)': pa.int16(),
+        'Bandwidth': pa.string(),
+        'Throughput(KB/s)': pa.float64(),
+    }
+
+def resolve_csv_reader(reader=DEFAULT_CSV_READER):
+    """使用するCSVの読み込み方法を決める（pyarrowがなければpandas）"""
+    if reader == 'pandas':
+        return 'pandas'
+    if _pyarrow_available():
+        return 'pyarrow'
+    if reader == 'pyarrow':
+        print("Warning: pyarrow is not installed, reading CSV files with pandas")
+    return 'pandas'
+
+def read_csv_frame(file, reader='pandas'):
+    """結果CSVを1つ読み込む（pyarrowで解析できない値がある場合はpandasで読み直す）"""
+    if reader == 'pyarrow':
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        try:
+            # RequestTime（RFC3339Nano）もArrowのパーサーで解析する（空文字はpandasと同様に欠損値）
+            options = pa_csv.ConvertOptions(column_types=arrow_column_types(), strings_can_be_null=True)
+            return pa_csv.read_csv(file, convert_options=options).to_pandas()
+        except pa.ArrowInvalid as e:
+            print(f"Warning: pyarrow failed to parse {file}, retrying with pandas: {e}")
+    return pd.read_csv(file)
+
+# 帯域幅ディレクトリ名 → Bandwidth値（CSVのBandwidthが空の場合の補完用）
+BANDWIDTH_DIR_MAPPING = {
+    '無制限': '0',
+    '1Mbps': '1mbit',
+    '2Mbps': '2mbit',
+    '3Mbps': '3mbit'
+}
+
+def extract_path_metadata(file, results_dir):
+    """パスから帯域幅ディレクトリ名と遅延値を抽出する"""
+    path_parts = file.replace(results_dir, '').split(os.sep)
+    path_parts = [p for p in path_parts if p]
+    
+    # 帯域幅ディレクトリ名を取得
+    bandwidth_dir = None
+    for part in path_parts:
+        if 'Mbps' in part or part == '無制限':
+            bandwidth_dir = part
+            break
+    
+    # 遅延ディレクトリ名を取得
+    delay = None
+    for part in path_parts:
+        if 'ms' in part:
+            delay_str = part.replace('ms', '')
+            try:
+                delay = int(delay_str)
+            except:
+                pass
+            break
+    
+    return bandwidth_dir, delay
+
+# セッション内の結果CSVの索引（セッションディレクトリ直下、毎回ディレクトリ全体を探索しないために使う）
+SESSION_INDEX_FILE = 'session_index.json'
+SESSION_INDEX_VERSION = 2
+# 結果CSVを探索しないディレクトリ（分析の出力とキャッシュ）
+INDEX_SKIP_DIRS = {'analysis', CACHE_DIRNAME}
+# 探索開始からこの時間以内に変更されたディレクトリは、探索中に変更された可能性があるため次回も探索し直す
+INDEX_MTIME_SLACK_NS = 2_000_000_000
+
+def walk_result_files(results_dir, dir_mtimes=None):
+    """結果CSVファイルを探索する（新旧のディレクトリ構造対応、dir_mtimesにはセッション直下を除く全ディレクトリのmtimeを記録する）"""
     # 新しい構造: session_XXX/◯MBps/Experiment/◯ms/http2_results.csv
     # または: session_XXX/◯MBps/Experiment/◯ms/http3_results.csv
     http2_files = []
     http3_files = []
     
     # 再帰的に検索
+    started = time.time_ns()
     for root, dirs, files in os.walk(results_dir):
+        dirs[:] = [d for d in dirs if d not in INDEX_SKIP_DIRS]
+        rel_path = os.path.relpath(root, results_dir)
+        if dir_mtimes is not None and rel_path != '.':
+            # まだCSVのない空の帯域幅・遅延ディレクトリも記録し、後からの追加を検出する
+            mtime_ns = os.stat(root).st_mtime_ns
+            dir_mtimes[rel_path] = mtime_ns if mtime_ns < started - INDEX_MTIME_SLACK_NS else None
         if 'http2_results.csv' in files:
             http2_files.append(os.path.join(root, 'http2_results.csv'))
         if 'http3_results.csv' in files:
@@ -94,85 +306,737 @@ def load_results(results_dir):
     if not http3_files:
         http3_files = glob.glob(os.path.join(results_dir, 'http3_*.csv'))
     
-    dfs = []
-    for file in http2_files + http3_files:
+    return http2_files + http3_files
+
+def count_csv_rows(path):
+    """CSVのデータ行数（ヘッダーを除く）"""
+    newlines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            newlines += block.count(b'\n')
+            last = block[-1:]
+    # 最終行が改行で終わっていない場合もその行を数える
+    if last != b'\n':
+        newlines += 1
+    return max(newlines - 1, 0)
+
+def session_entries(results_dir):
+    """セッション直下のサブディレクトリと旧構造の結果CSV（帯域幅・実験ディレクトリの追加を検出する）"""
+    entries = []
+    for entry in os.scandir(results_dir):
+        if entry.is_dir() and entry.name not in INDEX_SKIP_DIRS:
+            entries.append(entry.name + '/')
+        elif entry.name.startswith(('http2_', 'http3_')) and entry.name.endswith('.csv'):
+            entries.append(entry.name)
+    return sorted(entries)
+
+def index_entry(results_dir, rel_path, previous=None):
+    """索引の1ファイル分（mtimeとサイズが変わっていなければ前回の行数を使う）"""
+    file = os.path.join(results_dir, rel_path)
+    st = os.stat(file)
+    if previous is not None and previous['mtime_ns'] == st.st_mtime_ns and previous['bytes'] == st.st_size:
+        return previous
+    bandwidth_dir, delay = extract_path_metadata(file, results_dir)
+    return {
+        'path': rel_path,
+        'protocol': 'HTTP/2.0' if os.path.basename(file).startswith('http2') else 'HTTP/3.0',
+        'bandwidth': BANDWIDTH_DIR_MAPPING.get(bandwidth_dir),
+        'bandwidth_dir': bandwidth_dir,
+        'delay': delay,
+        'rows': count_csv_rows(file),
+        'bytes': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+    }
+
+def read_session_index(results_dir):
+    """保存済みの索引と、その後にディレクトリ構成が変わっていないか（索引, 有効か）"""
+    json_path = os.path.join(results_dir, SESSION_INDEX_FILE)
+    if not os.path.exists(json_path):
+        return None, False
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except Exception as e:
+        print(f"Warning: Failed to read {json_path}: {e}")
+        return None, False
+    if index.get('version') != SESSION_INDEX_VERSION:
+        return None, False
+    
+    # 直下の構成と、全てのディレクトリのmtimeが同じであればディレクトリ・ファイルの追加・削除はない
+    if index['entries'] != session_entries(results_dir):
+        return index, False
+    for rel_path, mtime_ns in index['dirs'].items():
         try:
-            df = pd.read_csv(file)
-            # パスから帯域幅と遅延を抽出
-            path_parts = file.replace(results_dir, '').split(os.sep)
-            path_parts = [p for p in path_parts if p]
-            
-            # 帯域幅ディレクトリ名を取得
-            for part in path_parts:
-                if 'Mbps' in part or part == '無制限':
-                    df['BandwidthDir'] = part
-                    break
-            
-            # 遅延ディレクトリ名を取得
-            for part in path_parts:
-                if 'ms' in part:
-                    delay_str = part.replace('ms', '')
-                    try:
-                        df['ExtractedDelay'] = int(delay_str)
-                    except:
-                        pass
-                    break
-            
-            dfs.append(df)
-        except Exception as e:
-            print(f"Warning: Failed to load {file}: {e}")
+            if os.stat(os.path.join(results_dir, rel_path)).st_mtime_ns != mtime_ns:
+                return index, False
+        except OSError:
+            return index, False
+    return index, True
+
+def session_index(results_dir):
+    """結果CSVの索引を返す（構成が変わった場合だけディレクトリを探索し、行数は変更されたファイルだけ数え直す）"""
+    saved, valid = read_session_index(results_dir)
+    dir_mtimes = {}
+    if valid:
+        rel_paths = [entry['path'] for entry in saved['files']]
+    else:
+        # 直下の構成は探索の前に取得する（探索中に追加されたディレクトリは次回検出される）
+        root_entries = session_entries(results_dir)
+        rel_paths = [os.path.relpath(file, results_dir) for file in walk_result_files(results_dir, dir_mtimes)]
     
-    if not dfs:
-        print("No result files found!")
-        return None
+    previous = {entry['path']: entry for entry in saved['files']} if saved else {}
+    entries = []
+    for rel_path in rel_paths:
+        try:
+            entries.append(index_entry(results_dir, rel_path, previous.get(rel_path)))
+        except OSError as e:
+            print(f"Warning: Failed to index {os.path.join(results_dir, rel_path)}: {e}")
     
-    result_df = pd.concat(dfs, ignore_index=True)
+    if valid and len(entries) == len(rel_paths):
+        # 構成が変わっていなければ、内容が変わったCSVの行数だけを更新する
+        index = dict(saved, files=entries)
+    else:
+        # 索引にあるCSVを読めなかった場合は、次回ディレクトリを探索し直すよう直下の構成を記録しない
+        index = {'version': SESSION_INDEX_VERSION, 'entries': root_entries if not valid else None,
+                 'dirs': dir_mtimes, 'files': entries}
     
+    if index != saved:
+        json_path = os.path.join(results_dir, SESSION_INDEX_FILE)
+        tmp_path = json_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, json_path)
+        except Exception as e:
+            print(f"Warning: Failed to write {json_path}: {e}")
+    return index
+
+def find_result_files(results_dir, bandwidths=None, delays=None):
+    """結果CSVファイルの一覧（セッションの索引から取得し、帯域幅・遅延で絞り込める）"""
+    files = []
+    for entry in session_index(results_dir)['files']:
+        # 帯域幅は tc の指定（'3mbit'）とディレクトリ名（'3Mbps'）のどちらでも指定できる
+        if bandwidths is not None and entry['bandwidth'] not in bandwidths and entry['bandwidth_dir'] not in bandwidths:
+            continue
+        if delays is not None and entry['delay'] not in delays:
+            continue
+        files.append(os.path.join(results_dir, entry['path']))
+    return files
+
+def attach_path_metadata(df, bandwidth_dir, delay):
+    """パスから抽出した帯域幅・遅延を列として付与し、正規化する"""
+    if bandwidth_dir is not None:
+        df['BandwidthDir'] = bandwidth_dir
+    if delay is not None:
+        df['ExtractedDelay'] = delay
+    return apply_result_schema(normalize_result_frame(df))
+
+def read_result_file(file, results_dir, reader='pandas'):
+    """結果CSVを1つ読み込み、パスから帯域幅と遅延を付与する"""
+    df = read_csv_frame(file, reader)
+    return attach_path_metadata(df, *extract_path_metadata(file, results_dir))
+
+def normalize_result_frame(df):
+    """BandwidthとNetworkDelay(ms)を列単位で正規化・補完する"""
     # Bandwidthカラムを文字列に統一（型の混在を防ぐ）
-    if 'Bandwidth' in result_df.columns:
-        result_df['Bandwidth'] = result_df['Bandwidth'].astype(str)
+    if 'Bandwidth' in df.columns:
+        bandwidth = df['Bandwidth'].astype(str)
         # 数値の0を文字列の'0'に変換
-        result_df.loc[result_df['Bandwidth'] == '0.0', 'Bandwidth'] = '0'
-        result_df.loc[result_df['Bandwidth'] == '0', 'Bandwidth'] = '0'
+        bandwidth = bandwidth.mask(bandwidth == '0.0', '0')
+    else:
+        bandwidth = pd.Series(np.nan, index=df.index, dtype=object)
     
     # 帯域幅ディレクトリ名からBandwidth値を補完（必要に応じて）
-    if 'BandwidthDir' in result_df.columns:
-        bandwidth_mapping = {
-            '無制限': '0',
-            '1Mbps': '1mbit',
-            '2Mbps': '2mbit',
-            '3Mbps': '3mbit'
-        }
-        for idx, row in result_df.iterrows():
-            if pd.isna(row.get('Bandwidth')) or row.get('Bandwidth') == '' or row.get('Bandwidth') == 'nan':
-                bw_dir = row.get('BandwidthDir', '')
-                if bw_dir in bandwidth_mapping:
-                    result_df.at[idx, 'Bandwidth'] = bandwidth_mapping[bw_dir]
+    if 'BandwidthDir' in df.columns:
+        missing = bandwidth.isna() | bandwidth.isin(['', 'nan'])
+        fill = df['BandwidthDir'].map(BANDWIDTH_DIR_MAPPING)
+        bandwidth = bandwidth.mask(missing & fill.notna(), fill)
+    
+    if 'Bandwidth' in df.columns or bandwidth.notna().any():
+        df['Bandwidth'] = bandwidth
     
     # 抽出した遅延値で補完（必要に応じて）
-    if 'ExtractedDelay' in result_df.columns:
-        for idx, row in result_df.iterrows():
-            if pd.isna(row.get('NetworkDelay(ms)')):
-                extracted = row.get('ExtractedDelay')
-                if not pd.isna(extracted):
-                    result_df.at[idx, 'NetworkDelay(ms)'] = extracted
+    if 'ExtractedDelay' in df.columns:
+        if 'NetworkDelay(ms)' in df.columns:
+            df['NetworkDelay(ms)'] = df['NetworkDelay(ms)'].fillna(df['ExtractedDelay'])
+        else:
+            df['NetworkDelay(ms)'] = df['ExtractedDelay']
+    
+    return df
+
+def apply_result_schema(df):
+    """RESULT_SCHEMA の型を適用する（カテゴリ型・float32・Int16、RequestTimeはdatetime）"""
+    for column, dtype in RESULT_SCHEMA.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        try:
+            df[column] = df[column].astype(dtype)
+        except (TypeError, ValueError) as e:
+            print(f"Warning: Failed to convert {column} to {dtype}: {e}")
+    
+    # RFC3339Nano形式の文字列を解析（タイムゾーン付きのためUTCに揃える）
+    if 'RequestTime' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['RequestTime']):
+        df['RequestTime'] = pd.to_datetime(df['RequestTime'], format='ISO8601', utc=True, errors='coerce')
+    # 解像度は値から推定されるため、読み込み方法によらずmetrics.goと同じナノ秒に揃える
+    if 'RequestTime' in df.columns and df['RequestTime'].dtype != 'datetime64[ns, UTC]':
+        df['RequestTime'] = df['RequestTime'].astype('datetime64[ns, UTC]')
+    
+    return df
+
+def concat_result_frames(dfs):
+    """カテゴリ型を保ったまま結果DataFrameを結合する"""
+    # カテゴリの集合が異なるとobject型に戻ってしまうため、先にカテゴリを揃える
+    categorical_columns = [column for column, dtype in RESULT_SCHEMA.items() if dtype == 'category']
+    dtypes = {}
+    for column in categorical_columns:
+        categories = [df[column].cat.categories for df in dfs
+                      if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype)]
+        if categories:
+            dtypes[column] = pd.CategoricalDtype(categories[0].append(categories[1:]).unique())
+    
+    dfs = [df.astype({column: dtype for column, dtype in dtypes.items() if column in df.columns}) for df in dfs]
+    return apply_result_schema(pd.concat(dfs, ignore_index=True))
+
+def _file_signature(path):
+    """キャッシュの有効性判定に使うファイルの (mtime, size)"""
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+def _cache_available():
+    """Parquetキャッシュに必要なpyarrowが使えるか"""
+    return _pyarrow_available()
+
+def load_results_cache(results_dir):
+    """キャッシュ済みの結果を読み込む（索引, DataFrame）"""
+    cache_dir = os.path.join(results_dir, CACHE_DIRNAME)
+    index_path = os.path.join(cache_dir, RESULTS_CACHE_INDEX)
+    data_path = os.path.join(cache_dir, RESULTS_CACHE_FILE)
+    if not os.path.exists(index_path) or not os.path.exists(data_path):
+        return {}, None
+    
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        cached_df = pd.read_parquet(data_path)
+    except Exception as e:
+        print(f"Warning: Failed to read results cache: {e}")
+        return {}, None
+    
+    if index.get('version') != RESULTS_CACHE_VERSION:
+        return {}, None
     
-    return result_df
+    return index.get('files', {}), cached_df
+
+def save_results_cache(results_dir, index, cache_df):
+    """読み込んだ結果をキャッシュに書き出す"""
+    cache_dir = os.path.join(results_dir, CACHE_DIRNAME)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # 書き込み途中のファイルを読まないよう一時ファイル経由で置き換える
+        data_path = os.path.join(cache_dir, RESULTS_CACHE_FILE)
+        cache_df.to_parquet(data_path + '.tmp', index=False)
+        os.replace(data_path + '.tmp', data_path)
+        index_path = os.path.join(cache_dir, RESULTS_CACHE_INDEX)
+        with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'version': RESULTS_CACHE_VERSION, 'files': index}, f, ensure_ascii=False, indent=2)
+        os.replace(index_path + '.tmp', index_path)
+    except Exception as e:
+        print(f"Warning: Failed to write results cache: {e}")
+
+def read_result_files(files, results_dir, jobs=1, reader='pandas'):
+    """複数の結果CSVを読み込む（jobs > 1 の場合はプロセスプールで並列に解析）"""
+    frames = {}
+    if jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as executor:
+            futures = {file: executor.submit(read_result_file, file, results_dir, reader) for file in files}
+            for file, future in futures.items():
+                try:
+                    frames[file] = future.result()
+                except Exception as e:
+                    print(f"Warning: Failed to load {file}: {e}")
+    else:
+        for file in files:
+            try:
+                frames[file] = read_result_file(file, results_dir, reader)
+            except Exception as e:
+                print(f"Warning: Failed to load {file}: {e}")
+    return frames
+
+def load_results(results_dir, use_cache=True, jobs=1, bandwidths=None, delays=None, reader=DEFAULT_CSV_READER):
+    """結果ファイルを読み込む（新しいディレクトリ構造対応、帯域幅・遅延を指定するとその条件のCSVだけを読む）"""
+    # session_data.arrow を直接指定した場合はCSVを探さずに読み込む
+    if os.path.isfile(results_dir):
+        return read_arrow_results(results_dir, bandwidths, delays)
+    
+    result_files = find_result_files(results_dir, bandwidths, delays)
+    selected = bandwidths is not None or delays is not None
+    
+    use_cache = use_cache and _cache_available()
+    cached_index, cached_df = load_results_cache(results_dir) if use_cache else ({}, None)
+    
+    # mtimeとサイズが一致するファイルはキャッシュから、それ以外はCSVから読み込む
+    signatures = {}
+    reused = []
+    to_parse = []
+    for file in result_files:
+        rel_path = os.path.relpath(file, results_dir)
+        try:
+            signatures[rel_path] = _file_signature(file)
+        except OSError as e:
+            print(f"Warning: Failed to load {file}: {e}")
+            continue
+        if cached_df is not None and cached_index.get(rel_path) == signatures[rel_path]:
+            reused.append(rel_path)
+        else:
+            to_parse.append(file)
+    
+    dfs = []
+    if reused:
+        dfs.append(cached_df[cached_df[SOURCE_FILE_COLUMN].isin(reused)])
+    
+    parsed = read_result_files(to_parse, results_dir, jobs=jobs, reader=resolve_csv_reader(reader))
+    loaded = set(reused)
+    for file, df in parsed.items():
+        rel_path = os.path.relpath(file, results_dir)
+        df[SOURCE_FILE_COLUMN] = rel_path
+        dfs.append(df)
+        loaded.add(rel_path)
+    
+    if reused:
+        print(f"Loaded {len(reused)} files from cache, parsed {len(parsed)} files")
+    
+    if not dfs:
+        print("No result files found!")
+        return None
+    
+    # 正規化と型の適用はファイルごとに済んでいるので結合のみ
+    result_df = concat_result_frames(dfs)
+    
+    # 追加・変更・削除があった場合のみキャッシュを更新（読み込みに失敗したファイルは除く）
+    index = {rel_path: sig for rel_path, sig in signatures.items() if rel_path in loaded}
+    # 一部の条件だけを読み込んだ場合は、セッション全体のキャッシュを置き換えない
+    if use_cache and not selected and index != cached_index:
+        save_results_cache(results_dir, index, result_df)
+    
+    return result_df.drop(columns=[SOURCE_FILE_COLUMN])
+
+# 条件別集計のキーと対象メトリクス
+CONDITION_KEYS = ['Protocol', 'NetworkDelay(ms)', 'Bandwidth']
+METRICS = ['TTFB(ms)', 'TotalTime(ms)', 'Throughput(KB/s)']
+
+# ストリーミング集計で1度に読み込む行数
+DEFAULT_CHUNKSIZE = 200_000
+
+# 分位点スケッチ（対数バケットのヒストグラム、相対誤差約1%、マージ可能）
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+SKETCH_MIN_VALUE = 1e-3
+SKETCH_MAX_VALUE = 1e7
+SKETCH_NUM_BUCKETS = int(np.ceil(np.log(SKETCH_MAX_VALUE / SKETCH_MIN_VALUE) / np.log(SKETCH_GAMMA))) + 2
+SKETCH_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+# 逆転地点を求めるメトリクス（これらはブートストラップ用に条件ごとの標本も保持する）
+CROSSOVER_METRICS = ('TTFB(ms)', 'TotalTime(ms)')
+
+# ブートストラップ（条件ごとに保持する標本数の上限、再標本化の回数、信頼水準）
+BOOTSTRAP_SAMPLE_SIZE = 5000
+BOOTSTRAP_RESAMPLES = 2000
+BOOTSTRAP_CONFIDENCE = 0.95
+BOOTSTRAP_SEED = 0
+# 1回に生成する再標本化インデックスの要素数の上限（メモリ使用量を抑える）
+BOOTSTRAP_BATCH_ELEMENTS = 4_000_000
+# 1回の再標本化で復元抽出する件数（条件全体の件数がこれより多い場合は、平均値のばらつきを全体の件数の分に換算する）
+BOOTSTRAP_RESAMPLE_SIZE = 1000
+
+def quantile_column(q):
+    """分位点の統計量名（0.5 → 'p50'、0.999 → 'p99.9'）"""
+    return f'p{q * 100:g}'
+
+def sketch_bucket_index(values):
+    """値を分位点スケッチのバケット番号に変換する（NaNは-1）"""
+    values = np.asarray(values, dtype=float)
+    index = np.zeros(len(values), dtype=np.int64)
+    # バケット0は最小値以下（0を含む）、以降は SKETCH_GAMMA 倍ごとの区間
+    positive = values > SKETCH_MIN_VALUE
+    index[positive] = 1 + np.floor(np.log(values[positive] / SKETCH_MIN_VALUE) / np.log(SKETCH_GAMMA)).astype(np.int64)
+    np.clip(index, 0, SKETCH_NUM_BUCKETS - 1, out=index)
+    index[np.isnan(values)] = -1
+    return index
+
+def sketch_quantile(counts, q):
+    """分位点スケッチから分位点を推定する"""
+    total = counts.sum()
+    if total == 0:
+        return np.nan
+    bucket = int(np.searchsorted(np.cumsum(counts), q * (total - 1), side='right'))
+    if bucket == 0:
+        return 0.0
+    # バケット区間 [lower, upper) の代表値（相対誤差が最小になる点）
+    lower = SKETCH_MIN_VALUE * SKETCH_GAMMA ** (bucket - 1)
+    upper = lower * SKETCH_GAMMA
+    return 2 * lower * upper / (lower + upper)
+
+def new_accumulator(sample=False):
+    """1つの条件・メトリクスのアキュムレータ（件数、Welford平均・分散、最小・最大、分位点スケッチ、標本）"""
+    acc = {
+        'count': 0,
+        'mean': 0.0,
+        'm2': 0.0,
+        'min': np.inf,
+        'max': -np.inf,
+        'sketch': np.zeros(SKETCH_NUM_BUCKETS, dtype=np.int64),
+    }
+    if sample:
+        acc['sample'] = np.empty(0)
+    return acc
+
+def merge_sample(acc, other):
+    """2つの標本を統合する（上限を超える場合は、統合後も全件からの一様抽出になるように間引く）"""
+    if len(acc['sample']) + len(other['sample']) <= BOOTSTRAP_SAMPLE_SIZE:
+        return np.concatenate([acc['sample'], other['sample']])
+    rng = np.random.default_rng([BOOTSTRAP_SEED, acc['count'], other['count']])
+    # 全件から一様に選んだときにotherの行が選ばれる件数は超幾何分布に従う
+    taken = rng.hypergeometric(other['count'], acc['count'], BOOTSTRAP_SAMPLE_SIZE)
+    return np.concatenate([
+        rng.choice(acc['sample'], BOOTSTRAP_SAMPLE_SIZE - taken, replace=False),
+        rng.choice(other['sample'], taken, replace=False),
+    ])
+
+def merge_accumulator(acc, other):
+    """アキュムレータを統合する（Chanらの並列Welford法）"""
+    if other['count'] == 0:
+        return acc
+    if 'sample' in acc and 'sample' in other:
+        acc['sample'] = merge_sample(acc, other)
+    count = acc['count'] + other['count']
+    delta = other['mean'] - acc['mean']
+    acc['mean'] += delta * other['count'] / count
+    acc['m2'] += other['m2'] + delta ** 2 * acc['count'] * other['count'] / count
+    acc['count'] = count
+    acc['min'] = min(acc['min'], other['min'])
+    acc['max'] = max(acc['max'], other['max'])
+    acc['sketch'] += other['sketch']
+    return acc
+
+def accumulate_frame(accumulators, df):
+    """DataFrame（またはチャンク）を条件別アキュムレータに加算する"""
+    metrics = [m for m in METRICS if m in df.columns]
+    # 値はfloat32で保持しているが、平均・分散の丸め誤差を避けるため集計はfloat64で行う
+    values = df[CONDITION_KEYS].join(df[metrics].astype('float64'))
+    grouped = values.groupby(CONDITION_KEYS, observed=True)
+    # 集計自体は列単位で行い、Pythonのループは条件（グループ）数だけ回す
+    agg = grouped[metrics].agg(['count', 'mean', 'var', 'min', 'max'])
+    buckets = {metric: sketch_bucket_index(values[metric].to_numpy()) for metric in metrics}
+    sample_values = {metric: values[metric].to_numpy() for metric in metrics}
+    positions = grouped.indices
+    
+    for key in agg.index:
+        cell = accumulators.setdefault(key, {metric: new_accumulator(sample=metric in CROSSOVER_METRICS) for metric in METRICS})
+        for metric in metrics:
+            count = int(agg.at[key, (metric, 'count')])
+            if count == 0:
+                continue
+            var = agg.at[key, (metric, 'var')]
+            bucket = buckets[metric][positions[key]]
+            sample = sample_values[metric][positions[key]]
+            merge_accumulator(cell[metric], {
+                'count': count,
+                'mean': agg.at[key, (metric, 'mean')],
+                'm2': 0.0 if pd.isna(var) else var * (count - 1),
+                'min': agg.at[key, (metric, 'min')],
+                'max': agg.at[key, (metric, 'max')],
+                'sketch': np.bincount(bucket[bucket >= 0], minlength=SKETCH_NUM_BUCKETS),
+                'sample': sample[~np.isnan(sample)],
+            })
+    
+    return accumulators
+
+def iter_result_chunks(file, results_dir, chunksize=DEFAULT_CHUNKSIZE):
+    """結果CSVをチャンク単位で読み込む（パス由来の帯域幅・遅延付き）"""
+    bandwidth_dir, delay = extract_path_metadata(file, results_dir)
+    for chunk in pd.read_csv(file, chunksize=chunksize):
+        yield attach_path_metadata(chunk, bandwidth_dir, delay)
+
+def stream_accumulators(results_dir, chunksize=DEFAULT_CHUNKSIZE):
+    """結果CSVをチャンク単位で読み込み、条件別アキュムレータを構築する（メモリ使用量は一定）"""
+    accumulators = {}
+    for file in find_result_files(results_dir):
+        try:
+            for chunk in iter_result_chunks(file, results_dir, chunksize):
+                accumulate_frame(accumulators, chunk)
+        except Exception as e:
+            print(f"Warning: Failed to load {file}: {e}")
+    return accumulators
+
+# ライブ集計（--watch）のポーリング間隔（秒）と出力ファイル
+DEFAULT_WATCH_INTERVAL = 10
+LIVE_SUMMARY_FILE = 'live_summary.txt'
+# ライブサマリーで警告を付けるエラー率
+LIVE_ERROR_RATE_WARNING = 0.05
+
+def read_appended_rows(file, state):
+    """前回の読み込み位置（state['offset']）以降に追記された行を読み込む（書き込み途中の最終行は次回に回す）"""
+    with open(file, 'rb') as f:
+        f.seek(state['offset'])
+        data = f.read()
+    end = data.rfind(b'\n')
+    if end < 0:
+        return None
+    data = data[:end + 1]
+    
+    # 最初の読み込みではヘッダー行から列名を取得する
+    columns = state['columns']
+    body = data
+    if columns is None:
+        header_end = data.index(b'\n') + 1
+        columns = list(pd.read_csv(io.BytesIO(data[:header_end])).columns)
+        body = data[header_end:]
+    df = pd.read_csv(io.BytesIO(body), header=None, names=columns) if body.strip() else None
+    
+    # 読み込みに成功してから位置を進める
+    state['offset'] += len(data)
+    state['columns'] = columns
+    return df
+
+def error_mask(df):
+    """エラーになったリクエストの行（Errorが空でない、またはステータスコードが2xx・3xx以外）"""
+    mask = pd.Series(False, index=df.index)
+    if 'Error' in df.columns:
+        mask |= df['Error'].notna() & (df['Error'].astype(str) != '')
+    if 'StatusCode' in df.columns:
+        status = pd.to_numeric(df['StatusCode'], errors='coerce')
+        mask |= (status < 200) | (status >= 400)
+    return mask
+
+def write_live_summary(summary_path, accumulators, errors, file_count):
+    """条件別の件数・エラー数・TTFB/Total Timeの平均とp99を書き出す（読み込み中でも壊れないよう置き換える）"""
+    tmp_path = summary_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("HTTP/2 vs HTTP/3 Live Summary\n")
+        f.write(f"Updated: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write("=" * 80 + "\n\n")
+        
+        if not accumulators:
+            f.write(f"Files: {file_count}, no records yet\n")
+        else:
+            stats = accumulators_to_stats(accumulators)
+            f.write(f"Files: {file_count}, records: {stats[('TTFB(ms)', 'count')].sum()}, "
+                    f"errors: {sum(errors.values())}\n\n")
+            f.write(f"{'Protocol':<10} {'Bandwidth':<10} {'Delay':>6} {'Requests':>9} {'Errors':>7} "
+                    f"{'TTFB avg':>10} {'TTFB p99':>10} {'Total avg':>10} {'Total p99':>10}\n")
+            f.write("-" * 90 + "\n")
+            # 統計表の行はアキュムレータのキー順に並んでいる
+            for key, (_, row) in zip(sorted(accumulators), stats.iterrows()):
+                condition = dict(zip(CONDITION_KEYS, key))
+                count = row[('TTFB(ms)', 'count')]
+                error_count = errors.get(key, 0)
+                # エラー率が高い条件には印を付ける
+                flag = ' !' if count > 0 and error_count / count >= LIVE_ERROR_RATE_WARNING else ''
+                f.write(f"{condition['Protocol']:<10} {condition['Bandwidth']:<10} {condition['NetworkDelay(ms)']:>6} {count:>9} {error_count:>7} "
+                        f"{row[('TTFB(ms)', 'mean')]:>10.3f} {row[('TTFB(ms)', 'p99')]:>10.3f} "
+                        f"{row[('TotalTime(ms)', 'mean')]:>10.3f} {row[('TotalTime(ms)', 'p99')]:>10.3f}{flag}\n")
+            f.write(f"\n! : エラー率 {LIVE_ERROR_RATE_WARNING:.0%} 以上\n")
+    os.replace(tmp_path, summary_path)
+
+def watch_results(results_dir, interval=DEFAULT_WATCH_INTERVAL):
+    """実行中のセッションの結果CSVを追記分だけ読み込み、条件別アキュムレータとライブサマリーを更新し続ける"""
+    summary_path = os.path.join(results_dir, LIVE_SUMMARY_FILE)
+    files = {}  # {file: {'offset': 読み込み済みバイト数, 'columns': 列名}}
+    accumulators = {}
+    errors = {}  # {条件: エラー件数}
+    
+    print(f"Watching {results_dir} every {interval}s (Ctrl+C to stop)...")
+    try:
+        while True:
+            new_records = 0
+            # 実行中のセッションはファイルが常に更新されるので、索引を使わずに探索する
+            for file in walk_result_files(results_dir):
+                state = files.setdefault(file, {'offset': 0, 'columns': None})
+                try:
+                    if os.path.getsize(file) < state['offset']:
+                        # ファイルが作り直された場合は全体を集計し直す
+                        print(f"Warning: {file} was truncated, restarting aggregation")
+                        files.clear()
+                        accumulators.clear()
+                        errors.clear()
+                        break
+                    df = read_appended_rows(file, state)
+                    if df is None or df.empty:
+                        continue
+                    bandwidth_dir, delay = extract_path_metadata(file, results_dir)
+                    df = attach_path_metadata(df, bandwidth_dir, delay)
+                    accumulate_frame(accumulators, df)
+                    for key, count in df[error_mask(df)].groupby(CONDITION_KEYS, observed=True).size().items():
+                        errors[key] = errors.get(key, 0) + int(count)
+                    new_records += len(df)
+                except Exception as e:
+                    print(f"Warning: Failed to read {file}: {e}")
+            
+            if new_records or not os.path.exists(summary_path):
+                write_live_summary(summary_path, accumulators, errors, len(files))
+                print(f"[{time.strftime('%H:%M:%S')}] +{new_records} records, {len(accumulators)} conditions -> {summary_path}")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    return accumulators
+
+def accumulators_to_stats(accumulators, keys=CONDITION_KEYS):
+    """アキュムレータを統計表に変換する（列は (メトリクス, 統計量) の2段）"""
+    columns = {(key, ''): [] for key in keys}
+    stat_names = ['count', 'mean', 'std', 'min', 'max'] + [quantile_column(q) for q in SKETCH_QUANTILES]
+    for metric in METRICS:
+        for stat in stat_names:
+            columns[(metric, stat)] = []
+    
+    for key in sorted(accumulators):
+        for name, value in zip(keys, key):
+            columns[(name, '')].append(value)
+        for metric in METRICS:
+            acc = accumulators[key][metric]
+            count = acc['count']
+            columns[(metric, 'count')].append(count)
+            columns[(metric, 'mean')].append(acc['mean'] if count > 0 else np.nan)
+            columns[(metric, 'std')].append(np.sqrt(acc['m2'] / (count - 1)) if count > 1 else np.nan)
+            columns[(metric, 'min')].append(acc['min'] if count > 0 else np.nan)
+            columns[(metric, 'max')].append(acc['max'] if count > 0 else np.nan)
+            for q in SKETCH_QUANTILES:
+                columns[(metric, quantile_column(q))].append(sketch_quantile(acc['sketch'], q))
+    
+    return pd.DataFrame(columns)
+
+def rollup_accumulators(accumulators, keys):
+    """条件別アキュムレータを指定したキー（CONDITION_KEYSの部分集合）ごとに統合する"""
+    positions = [CONDITION_KEYS.index(key) for key in keys]
+    rolled = {}
+    for key, cell in accumulators.items():
+        target = rolled.setdefault(tuple(key[i] for i in positions), {metric: new_accumulator() for metric in METRICS})
+        for metric in METRICS:
+            merge_accumulator(target[metric], cell[metric])
+    return rolled
+
+def build_aggregate_cube(accumulators):
+    """全てのグラフ・レポートが参照する集計キューブを構築する"""
+    bandwidth_keys = ['Protocol', 'Bandwidth']
+    return {
+        # Protocol × NetworkDelay(ms) × Bandwidth
+        'cells': accumulators_to_stats(accumulators),
+        # Protocol × Bandwidth（全遅延を統合）
+        'bandwidth': accumulators_to_stats(rollup_accumulators(accumulators, bandwidth_keys), bandwidth_keys),
+        # Protocol（全条件を統合）
+        'protocol': accumulators_to_stats(rollup_accumulators(accumulators, ['Protocol']), ['Protocol']),
+        # 逆転地点のブートストラップ用の条件別標本 {(Protocol, NetworkDelay(ms), Bandwidth): {metric: 値}}
+        'samples': {key: {metric: cell[metric]['sample'] for metric in CROSSOVER_METRICS if 'sample' in cell[metric]}
+                    for key, cell in accumulators.items()},
+        # 標本の元になった条件全体の件数と平均値 {(Protocol, NetworkDelay(ms), Bandwidth): {metric: (件数, 平均値)}}
+        'sample_totals': {key: {metric: (cell[metric]['count'], cell[metric]['mean']) for metric in CROSSOVER_METRICS
+                                if 'sample' in cell[metric]}
+                          for key, cell in accumulators.items()},
+    }
 
 def analyze_by_condition(df):
     """ネットワーク条件別に分析"""
-    # 条件でグループ化
-    grouped = df.groupby(['Protocol', 'NetworkDelay(ms)', 'Bandwidth'])
+    return accumulators_to_stats(accumulate_frame({}, df))
+
+def condition_table(stats, stat='mean'):
+    """統計表から1つの統計量を取り出した表（キー列と各メトリクス）"""
+    keys = [column for column, level in stats.columns if level == '']
+    return pd.concat([stats[keys].droplevel(1, axis=1), stats.xs(stat, axis=1, level=1)], axis=1)
+
+def cube_row(table, **keys):
+    """集計キューブの表から1行を取り出す（該当なしはNone）"""
+    mask = np.ones(len(table), dtype=bool)
+    for name, value in keys.items():
+        mask &= (table[name] == value).to_numpy()
+    if not mask.any():
+        return None
+    return table[mask].iloc[0]
+
+# 平滑化した曲線を折れ線で近似するときの許容誤差（出力画像上のピクセル）
+CURVE_TOLERANCE_PX = 0.25
+
+# 平滑化済みの曲線（同じ系列を描く複数のグラフで再利用する）
+SMOOTHED_CURVES = {}
+
+def fit_smoothed_curve(valid_x, valid_y, valid_std, label):
+    """Savitzky-Golayフィルタで平滑化し、3次スプラインを求める（同じ系列は再計算しない）"""
+    key = (valid_x.tobytes(), valid_y.tobytes(), valid_std.tobytes() if valid_std is not None else None)
+    if key in SMOOTHED_CURVES:
+        return SMOOTHED_CURVES[key]
+    start = time.perf_counter()
+    
+    if len(valid_x) >= 5:  # Savitzky-Golayフィルタには最低5点必要
+        # 窓サイズを大きくして滑らかに（最大51）
+        window_length = min(51, len(valid_y) if len(valid_y) % 2 == 1 else len(valid_y) - 1)
+        if window_length < 5:
+            window_length = 5
+        polyorder = min(3, window_length - 1)
+        
+        try:
+            # Savitzky-Golayフィルタを適用
+            smoothed_y = savgol_filter(valid_y, window_length, polyorder)
+            if valid_std is not None:
+                smoothed_std = savgol_filter(valid_std, window_length, polyorder)
+                smoothed_std = np.maximum(smoothed_std, 0)  # 負の値にならないように
+            else:
+                smoothed_std = None
+        except Exception as e:
+            print(f"警告: Savitzky-Golayフィルタに失敗しました ({label}): {e}. 元のデータを使用します。")
+            smoothed_y = valid_y
+            smoothed_std = valid_std
+    else:
+        smoothed_y = valid_y
+        smoothed_std = valid_std
     
-    stats = grouped.agg({
-        'TTFB(ms)': ['mean', 'std', 'min', 'max'],
-        'TotalTime(ms)': ['mean', 'std', 'min', 'max'],
-        'Throughput(KB/s)': ['mean', 'std']
-    }).reset_index()
+    # 3次スプライン補間で極めて滑らかな曲線を作成
+    spl = None
+    if len(valid_x) >= 4:
+        try:
+            spl = make_interp_spline(valid_x, smoothed_y, k=3)
+        except Exception as e:
+            # スプライン補間が失敗した場合は線形補間（データ点を結ぶ折れ線）を使用
+            print(f"警告: スプライン補間に失敗しました ({label}): {e}. 線形補間を使用します。")
     
-    return stats
+    SMOOTHED_CURVES[key] = (smoothed_y, smoothed_std, spl)
+    add_profile_section('spline smoothing', start)
+    return SMOOTHED_CURVES[key]
+
+def curve_sample_points(ax, valid_x, spl, y_range, dpi):
+    """出力画像上で折れ線近似の誤差が許容誤差以下になるスプラインの評価点を求める"""
+    # データ座標 → 出力画像のピクセルへの換算
+    position = ax.get_position()
+    scale_x = ax.figure.get_figwidth() * position.width * dpi / (valid_x.max() - valid_x.min())
+    scale_y = ax.figure.get_figheight() * position.height * dpi / y_range
+    
+    # 3次スプラインの2階微分は各区間で線形なので、区間の両端の大きい方がその区間の最大値
+    curvature = np.abs(spl.derivative(2)(valid_x)) * scale_y / scale_x ** 2
+    max_curvature = np.maximum(curvature[:-1], curvature[1:])
+    
+    # 弦の誤差（幅h・2階微分Mで h^2 * M / 8）が許容誤差以下になる分割数（1ピクセル1点まで）
+    widths_px = np.diff(valid_x) * scale_x
+    counts = np.ceil(widths_px * np.sqrt(max_curvature / (8 * CURVE_TOLERANCE_PX)))
+    counts = np.clip(counts, 1, np.maximum(np.ceil(widths_px), 1)).astype(int)
+    
+    segments = [np.linspace(x0, x1, n, endpoint=False) for x0, x1, n in zip(valid_x[:-1], valid_x[1:], counts)]
+    return np.concatenate(segments + [valid_x[-1:]])
+
+# グラフに帯で表示する分位点の範囲
+PERCENTILE_BAND = ('p50', 'p99')
+
+def percentile_band_dict(stats, metric, band=PERCENTILE_BAND):
+    """プロトコルごとの分位点の帯（遅延順の下端・上端）"""
+    lower = condition_table(stats, band[0])
+    upper = condition_table(stats, band[1])
+    y_band_dict = {}
+    for protocol in ['HTTP/2.0', 'HTTP/3.0']:
+        protocol_lower = lower[lower['Protocol'] == protocol].sort_values('NetworkDelay(ms)')
+        protocol_upper = upper[upper['Protocol'] == protocol].sort_values('NetworkDelay(ms)')
+        if not protocol_lower.empty:
+            y_band_dict[protocol] = (protocol_lower[metric].values, protocol_upper[metric].values)
+    return y_band_dict if y_band_dict else None
 
-def plot_single_graph(ax, x_data, y_data_dict, x_label, y_label, title, protocol_colors, show_labels=True, fill_area=True, label_unit='ms', y_std_dict=None):
+def plot_single_graph(ax, x_data, y_data_dict, x_label, y_label, title, protocol_colors, show_labels=True, fill_area=True, label_unit='ms', y_std_dict=None, dpi=RENDER_PROFILES[DEFAULT_QUALITY]['dpi'], y_band_dict=None):
     """単一グラフを描画するヘルパー関数（画像デザイン完全再現・スムージング版）"""
     # 背景色設定
     ax.set_facecolor(COLORS['background'])
@@ -206,8 +1070,8 @@ def plot_single_graph(ax, x_data, y_data_dict, x_label, y_label, title, protocol
             y_std = y_std_dict[protocol]
         
         # データをnumpy配列に変換
-        x_array = np.array(x_data)
-        y_array = np.array(y_values)
+        x_array = np.asarray(x_data, dtype=float)
+        y_array = np.asarray(y_values, dtype=float)
         
         # NaN値を処理
         valid_mask = ~np.isnan(y_array)
@@ -216,62 +1080,30 @@ def plot_single_graph(ax, x_data, y_data_dict, x_label, y_label, title, protocol
         
         valid_x = x_array[valid_mask]
         valid_y = y_array[valid_mask]
-        valid_std = y_std[valid_mask] if y_std is not None and len(y_std) == len(y_values) else None
-        
-        # 外れ値に影響されない高品質なスムージング処理
-        if len(valid_x) >= 5:  # Savitzky-Golayフィルタには最低5点必要
-            # 窓サイズを大きくして滑らかに（最大51）
-            window_length = min(51, len(valid_y) if len(valid_y) % 2 == 1 else len(valid_y) - 1)
-            if window_length < 5:
-                window_length = 5
-            polyorder = min(3, window_length - 1)
-            
-            try:
-                # Savitzky-Golayフィルタを適用
-                smoothed_y = savgol_filter(valid_y, window_length, polyorder)
-                if valid_std is not None:
-                    smoothed_std = savgol_filter(valid_std, window_length, polyorder)
-                    smoothed_std = np.maximum(smoothed_std, 0)  # 負の値にならないように
-                else:
-                    smoothed_std = None
-            except Exception as e:
-                print(f"警告: Savitzky-Golayフィルタに失敗しました ({protocol}): {e}. 元のデータを使用します。")
-                smoothed_y = valid_y
-                smoothed_std = valid_std
-        else:
-            smoothed_y = valid_y
-            smoothed_std = valid_std
-        
-        # 3次スプライン補間で極めて滑らかな曲線を作成
-        if len(valid_x) >= 4:
-            # 補間点を大幅に増やす（100倍）で極めて滑らかな曲線を実現
-            num_points = len(valid_x) * 100
-            smooth_x = np.linspace(valid_x.min(), valid_x.max(), num_points)
-            
-            try:
-                # 3次スプライン補間
-                spl = make_interp_spline(valid_x, smoothed_y, k=3)
-                smooth_y = spl(smooth_x)
-                
-                # 標準偏差も滑らかに補間
-                if smoothed_std is not None:
-                    smooth_std = np.interp(smooth_x, valid_x, smoothed_std)
-                else:
-                    smooth_std = None
-            except Exception as e:
-                # スプライン補間が失敗した場合は線形補間を使用
-                print(f"警告: スプライン補間に失敗しました ({protocol}): {e}. 線形補間を使用します。")
-                smooth_x = np.linspace(valid_x.min(), valid_x.max(), num_points)
-                smooth_y = np.interp(smooth_x, valid_x, smoothed_y)
-                if smoothed_std is not None:
-                    smooth_std = np.interp(smooth_x, valid_x, smoothed_std)
-                else:
-                    smooth_std = None
+        valid_std = np.asarray(y_std, dtype=float)[valid_mask] if y_std is not None and len(y_std) == len(y_values) else None
+        
+        # 外れ値に影響されない高品質なスムージング処理と3次スプライン補間
+        smoothed_y, smoothed_std, spl = fit_smoothed_curve(valid_x, valid_y, valid_std, protocol)
+        
+        # 評価点は出力画像上の曲線の曲がり具合から決める（直線に近い区間は少なく）
+        if spl is not None:
+            y_range = (y_max - y_min if y_max > y_min else 1) * 1.24
+            smooth_x = curve_sample_points(ax, valid_x, spl, y_range, dpi)
+            smooth_y = spl(smooth_x)
+            # 標準偏差は線形補間
+            smooth_std = np.interp(smooth_x, valid_x, smoothed_std) if smoothed_std is not None else None
         else:
             smooth_x = valid_x
             smooth_y = smoothed_y
             smooth_std = smoothed_std
         
+        # 分位点の帯（p50〜p99、上端のp99は点線）
+        if y_band_dict and protocol in y_band_dict and len(y_band_dict[protocol][0]) == len(y_values):
+            band_lower = np.interp(smooth_x, valid_x, np.asarray(y_band_dict[protocol][0], dtype=float)[valid_mask])
+            band_upper = np.interp(smooth_x, valid_x, np.asarray(y_band_dict[protocol][1], dtype=float)[valid_mask])
+            ax.fill_between(smooth_x, band_lower, band_upper, alpha=0.08, color=colors['fill'], linewidth=0, zorder=1, label='_nolegend_')
+            ax.plot(smooth_x, band_upper, linestyle=':', linewidth=1.5, color=colors['main'], alpha=0.7, zorder=2, label='_nolegend_')
+        
         # 標準偏差の塗りつぶし（スムージングされた曲線に基づく）
         if smooth_std is not None:
             lower = smooth_y - smooth_std
@@ -339,7 +1171,10 @@ def plot_single_graph(ax, x_data, y_data_dict, x_label, y_label, title, protocol
     
     # 標準偏差の注釈を追加（画像準拠：左下、フォントサイズ18pt）
     if y_std_dict:
-        ax.text(0.02, 0.75, '※塗りつぶし部分は標準偏差の範囲を示す', 
+        note = '※塗りつぶし部分は標準偏差の範囲を示す'
+        if y_band_dict:
+            note += f'\n※薄い塗りつぶしは{PERCENTILE_BAND[0]}〜{PERCENTILE_BAND[1]}（点線は{PERCENTILE_BAND[1]}）'
+        ax.text(0.02, 0.75, note, 
                transform=ax.transAxes, fontsize=18, fontweight='bold', verticalalignment='top',
                color=COLORS['text'],
                bbox=dict(boxstyle='round,pad=0.6', facecolor='wheat', alpha=0.5, 
@@ -348,17 +1183,22 @@ def plot_single_graph(ax, x_data, y_data_dict, x_label, y_label, title, protocol
     # Y軸範囲の調整（上下12%の余白）
     if y_data_dict:
         all_values = [v for values in y_data_dict.values() for v in values if len(values) > 0]
+        # 分位点の帯も収まるようにする
+        if y_band_dict:
+            all_values += [v for lower, upper in y_band_dict.values() for v in (*lower, *upper) if not np.isnan(v)]
         if all_values:
             y_min_val = min(all_values)
             y_max_val = max(all_values)
             y_range = y_max_val - y_min_val if y_max_val > y_min_val else 1
             ax.set_ylim(y_min_val - y_range * 0.12, y_max_val + y_range * 0.12)
 
-def plot_ttfb_comparison(df, output_dir):
+def plot_ttfb_comparison(cube, output_dir, quality=DEFAULT_QUALITY):
     """TTFBの比較"""
+    load_plotting()
+    stats = cube['cells']
     # データの特性を検出
-    unique_bandwidths = df['Bandwidth'].unique()
-    unique_delays = df['NetworkDelay(ms)'].unique()
+    unique_bandwidths = stats['Bandwidth'].unique()
+    unique_delays = stats['NetworkDelay(ms)'].unique()
     
     # 帯域幅が1種類のみの場合は1つのグラフのみ表示
     if len(unique_bandwidths) == 1:
@@ -366,7 +1206,7 @@ def plot_ttfb_comparison(df, output_dir):
         fig, ax = plt.subplots(1, 1, figsize=(12, 8))
         fig.patch.set_facecolor(COLORS['background'])
         
-        delay_data = df.groupby(['Protocol', 'NetworkDelay(ms)'])['TTFB(ms)'].mean().reset_index()
+        delay_data = condition_table(stats, 'mean')
         bandwidth_label = f"帯域幅: {unique_bandwidths[0]}" if unique_bandwidths[0] != '0' and unique_bandwidths[0] != 0 else "帯域無制限"
         
         # データを整理
@@ -382,7 +1222,7 @@ def plot_ttfb_comparison(df, output_dir):
         
         if x_data is not None and len(y_data_dict) > 0:
             # 標準偏差を計算
-            delay_std = df.groupby(['Protocol', 'NetworkDelay(ms)'])['TTFB(ms)'].std().reset_index()
+            delay_std = condition_table(stats, 'std')
             y_std_dict = {}
             for protocol in ['HTTP/2.0', 'HTTP/3.0']:
                 protocol_std = delay_std[delay_std['Protocol'] == protocol].sort_values('NetworkDelay(ms)')
@@ -392,14 +1232,15 @@ def plot_ttfb_comparison(df, output_dir):
             plot_single_graph(ax, x_data, y_data_dict, 
                              'ネットワーク遅延 (ms)', '平均TTFB (ms)', 
                              'TTFBの比較',
-                             COLORS, show_labels=True, fill_area=False, label_unit='ms', y_std_dict=y_std_dict if y_std_dict else None)
+                             COLORS, show_labels=True, fill_area=False, label_unit='ms', y_std_dict=y_std_dict if y_std_dict else None,
+                             dpi=RENDER_PROFILES[quality]['dpi'], y_band_dict=percentile_band_dict(stats, 'TTFB(ms)'))
     else:
         # 帯域幅が複数ある場合は2つのグラフを表示
         fig, axes = plt.subplots(1, 2, figsize=(14, 9))
         fig.patch.set_facecolor(COLORS['background'])
         
         # 左側のグラフ: 遅延による影響（帯域無制限）
-        delay_data = df[(df['Bandwidth'] == '0') | (df['Bandwidth'] == 0)].groupby(['Protocol', 'NetworkDelay(ms)'])['TTFB(ms)'].mean().reset_index()
+        delay_data = condition_table(stats[stats['Bandwidth'] == '0'], 'mean')
         
         # データを整理
         y_data_dict = {}
@@ -414,7 +1255,7 @@ def plot_ttfb_comparison(df, output_dir):
         
         if x_data is not None and len(y_data_dict) > 0:
             # 標準偏差を計算
-            delay_std = df[(df['Bandwidth'] == '0') | (df['Bandwidth'] == 0)].groupby(['Protocol', 'NetworkDelay(ms)'])['TTFB(ms)'].std().reset_index()
+            delay_std = condition_table(stats[stats['Bandwidth'] == '0'], 'std')
             y_std_dict = {}
             for protocol in ['HTTP/2.0', 'HTTP/3.0']:
                 protocol_std = delay_std[delay_std['Protocol'] == protocol].sort_values('NetworkDelay(ms)')
@@ -424,17 +1265,12 @@ def plot_ttfb_comparison(df, output_dir):
             plot_single_graph(axes[0], x_data, y_data_dict, 
                              'ネットワーク遅延 (ms)', '平均TTFB (ms)', 
                              'TTFBの比較 (帯域無制限)',
-                             COLORS, show_labels=True, fill_area=False, label_unit='ms', y_std_dict=y_std_dict if y_std_dict else None)
+                             COLORS, show_labels=True, fill_area=False, label_unit='ms', y_std_dict=y_std_dict if y_std_dict else None,
+                             dpi=RENDER_PROFILES[quality]['dpi'], y_band_dict=percentile_band_dict(stats[stats['Bandwidth'] == '0'], 'TTFB(ms)'))
         
         # 右側のグラフ: 帯域幅による影響（遅延0msの場合）
-        bandwidth_data = df[df['NetworkDelay(ms)'] == 0].copy()
         bandwidth_order = ['100mbit', '10mbit', '5mbit', '1mbit', '0']
-        bandwidth_data['BandwidthOrder'] = bandwidth_data['Bandwidth'].apply(
-            lambda x: bandwidth_order.index(str(x)) if str(x) in bandwidth_order else 999
-        )
-        bandwidth_data = bandwidth_data.sort_values('BandwidthOrder')
-        
-        bw_grouped = bandwidth_data.groupby(['Protocol', 'Bandwidth'])['TTFB(ms)'].mean().reset_index()
+        bw_grouped = condition_table(stats[stats['NetworkDelay(ms)'] == 0], 'mean')
         # BandwidthOrderを追加
         bw_grouped['BandwidthOrder'] = bw_grouped['Bandwidth'].apply(
             lambda x: bandwidth_order.index(str(x)) if str(x) in bandwidth_order else 999
@@ -479,16 +1315,17 @@ def plot_ttfb_comparison(df, output_dir):
                 spine.set_color(COLORS['axis'])
     
     plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'ttfb_comparison.png'), dpi=300, 
-                bbox_inches='tight', facecolor='white', pad_inches=0.2)
-    print(f"Saved: {output_dir}/ttfb_comparison.png")
+    output_file = save_figure(output_dir, 'ttfb_comparison', quality)
+    print(f"Saved: {output_file}")
     plt.close()
 
-def plot_throughput_comparison(df, output_dir):
+def plot_throughput_comparison(cube, output_dir, quality=DEFAULT_QUALITY):
     """スループットの比較グラフ（画像デザイン完全再現）"""
+    load_plotting()
+    stats = cube['cells']
     # データの特性を検出
-    unique_bandwidths = df['Bandwidth'].unique()
-    unique_delays = df['NetworkDelay(ms)'].unique()
+    unique_bandwidths = stats['Bandwidth'].unique()
+    unique_delays = stats['NetworkDelay(ms)'].unique()
     
     # 帯域幅が1種類のみの場合は1つのグラフのみ表示
     if len(unique_bandwidths) == 1:
@@ -496,7 +1333,7 @@ def plot_throughput_comparison(df, output_dir):
         fig, ax = plt.subplots(1, 1, figsize=(12, 8))
         fig.patch.set_facecolor(COLORS['background'])
         
-        delay_data = df.groupby(['Protocol', 'NetworkDelay(ms)'])['Throughput(KB/s)'].mean().reset_index()
+        delay_data = condition_table(stats, 'mean')
         
         # データを整理
         y_data_dict = {}
@@ -511,7 +1348,7 @@ def plot_throughput_comparison(df, output_dir):
         
         if x_data is not None and len(y_data_dict) > 0:
             # 標準偏差を計算
-            delay_std = df.groupby(['Protocol', 'NetworkDelay(ms)'])['Throughput(KB/s)'].std().reset_index()
+            delay_std = condition_table(stats, 'std')
             y_std_dict = {}
             for protocol in ['HTTP/2.0', 'HTTP/3.0']:
                 protocol_std = delay_std[delay_std['Protocol'] == protocol].sort_values('NetworkDelay(ms)')
@@ -521,14 +1358,15 @@ def plot_throughput_comparison(df, output_dir):
             plot_single_graph(ax, x_data, y_data_dict, 
                              'ネットワーク遅延 (ms)', '平均スループット (KB/s)', 
                              'スループットの比較',
-                             COLORS, show_labels=True, fill_area=False, label_unit='KB/s', y_std_dict=y_std_dict if y_std_dict else None)
+                             COLORS, show_labels=True, fill_area=False, label_unit='KB/s', y_std_dict=y_std_dict if y_std_dict else None,
+                             dpi=RENDER_PROFILES[quality]['dpi'])
     else:
         # 帯域幅が複数ある場合は2つのグラフを表示
         fig, axes = plt.subplots(1, 2, figsize=(14, 9))
         fig.patch.set_facecolor(COLORS['background'])
         
         # 左側のグラフ: 遅延による影響（帯域無制限）
-        delay_data = df[(df['Bandwidth'] == '0') | (df['Bandwidth'] == 0)].groupby(['Protocol', 'NetworkDelay(ms)'])['Throughput(KB/s)'].mean().reset_index()
+        delay_data = condition_table(stats[stats['Bandwidth'] == '0'], 'mean')
         
         # データを整理
         y_data_dict = {}
@@ -543,7 +1381,7 @@ def plot_throughput_comparison(df, output_dir):
         
         if x_data is not None and len(y_data_dict) > 0:
             # 標準偏差を計算
-            delay_std = df[(df['Bandwidth'] == '0') | (df['Bandwidth'] == 0)].groupby(['Protocol', 'NetworkDelay(ms)'])['Throughput(KB/s)'].std().reset_index()
+            delay_std = condition_table(stats[stats['Bandwidth'] == '0'], 'std')
             y_std_dict = {}
             for protocol in ['HTTP/2.0', 'HTTP/3.0']:
                 protocol_std = delay_std[delay_std['Protocol'] == protocol].sort_values('NetworkDelay(ms)')
@@ -553,18 +1391,13 @@ def plot_throughput_comparison(df, output_dir):
             plot_single_graph(axes[0], x_data, y_data_dict, 
                              'ネットワーク遅延 (ms)', '平均スループット (KB/s)', 
                              'スループットの比較 (帯域無制限)',
-                             COLORS, show_labels=True, fill_area=False, label_unit='KB/s', y_std_dict=y_std_dict if y_std_dict else None)
+                             COLORS, show_labels=True, fill_area=False, label_unit='KB/s', y_std_dict=y_std_dict if y_std_dict else None,
+                             dpi=RENDER_PROFILES[quality]['dpi'])
         
         # 右側のグラフ: 帯域幅による影響（遅延0msの場合）
         # 帯域幅が複数ある場合: 帯域幅による影響（遅延0msの場合）
-        bandwidth_data = df[df['NetworkDelay(ms)'] == 0].copy()
         bandwidth_order = ['100mbit', '10mbit', '5mbit', '1mbit', '0']
-        bandwidth_data['BandwidthOrder'] = bandwidth_data['Bandwidth'].apply(
-            lambda x: bandwidth_order.index(str(x)) if str(x) in bandwidth_order else 999
-        )
-        bandwidth_data = bandwidth_data.sort_values('BandwidthOrder')
-        
-        bw_grouped = bandwidth_data.groupby(['Protocol', 'Bandwidth'])['Throughput(KB/s)'].mean().reset_index()
+        bw_grouped = condition_table(stats[stats['NetworkDelay(ms)'] == 0], 'mean')
         # BandwidthOrderを追加
         bw_grouped['BandwidthOrder'] = bw_grouped['Bandwidth'].apply(
             lambda x: bandwidth_order.index(str(x)) if str(x) in bandwidth_order else 999
@@ -609,16 +1442,17 @@ def plot_throughput_comparison(df, output_dir):
                 spine.set_color(COLORS['axis'])
     
     plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'throughput_comparison.png'), dpi=300, 
-                bbox_inches='tight', facecolor='white', pad_inches=0.2)
-    print(f"Saved: {output_dir}/throughput_comparison.png")
+    output_file = save_figure(output_dir, 'throughput_comparison', quality)
+    print(f"Saved: {output_file}")
     plt.close()
 
-def plot_total_time_comparison(df, output_dir):
+def plot_total_time_comparison(cube, output_dir, quality=DEFAULT_QUALITY):
     """Total Timeの比較グラフ"""
+    load_plotting()
+    stats = cube['cells']
     # データの特性を検出
-    unique_bandwidths = df['Bandwidth'].unique()
-    unique_delays = df['NetworkDelay(ms)'].unique()
+    unique_bandwidths = stats['Bandwidth'].unique()
+    unique_delays = stats['NetworkDelay(ms)'].unique()
     
     # 帯域幅が1種類のみの場合は1つのグラフのみ表示
     if len(unique_bandwidths) == 1:
@@ -626,7 +1460,7 @@ def plot_total_time_comparison(df, output_dir):
         fig, ax = plt.subplots(1, 1, figsize=(12, 8))
         fig.patch.set_facecolor(COLORS['background'])
         
-        delay_data = df.groupby(['Protocol', 'NetworkDelay(ms)'])['TotalTime(ms)'].mean().reset_index()
+        delay_data = condition_table(stats, 'mean')
         bandwidth_label = f"帯域幅: {unique_bandwidths[0]}" if unique_bandwidths[0] != '0' and unique_bandwidths[0] != 0 else "帯域無制限"
         
         # データを整理
@@ -642,7 +1476,7 @@ def plot_total_time_comparison(df, output_dir):
         
         if x_data is not None and len(y_data_dict) > 0:
             # 標準偏差を計算
-            delay_std = df.groupby(['Protocol', 'NetworkDelay(ms)'])['TotalTime(ms)'].std().reset_index()
+            delay_std = condition_table(stats, 'std')
             y_std_dict = {}
             for protocol in ['HTTP/2.0', 'HTTP/3.0']:
                 protocol_std = delay_std[delay_std['Protocol'] == protocol].sort_values('NetworkDelay(ms)')
@@ -652,14 +1486,15 @@ def plot_total_time_comparison(df, output_dir):
             plot_single_graph(ax, x_data, y_data_dict, 
                              'ネットワーク遅延 (ms)', '平均Total Time (ms)', 
                              'Total Timeの比較',
-                             COLORS, show_labels=True, fill_area=False, label_unit='ms', y_std_dict=y_std_dict if y_std_dict else None)
+                             COLORS, show_labels=True, fill_area=False, label_unit='ms', y_std_dict=y_std_dict if y_std_dict else None,
+                             dpi=RENDER_PROFILES[quality]['dpi'], y_band_dict=percentile_band_dict(stats, 'TotalTime(ms)'))
     else:
         # 帯域幅が複数ある場合は2つのグラフを表示
         fig, axes = plt.subplots(1, 2, figsize=(14, 9))
         fig.patch.set_facecolor(COLORS['background'])
         
         # 左側のグラフ: 遅延による影響（帯域無制限）
-        delay_data = df[(df['Bandwidth'] == '0') | (df['Bandwidth'] == 0)].groupby(['Protocol', 'NetworkDelay(ms)'])['TotalTime(ms)'].mean().reset_index()
+        delay_data = condition_table(stats[stats['Bandwidth'] == '0'], 'mean')
         
         # データを整理
         y_data_dict = {}
@@ -674,7 +1509,7 @@ def plot_total_time_comparison(df, output_dir):
         
         if x_data is not None and len(y_data_dict) > 0:
             # 標準偏差を計算
-            delay_std = df[(df['Bandwidth'] == '0') | (df['Bandwidth'] == 0)].groupby(['Protocol', 'NetworkDelay(ms)'])['TotalTime(ms)'].std().reset_index()
+            delay_std = condition_table(stats[stats['Bandwidth'] == '0'], 'std')
             y_std_dict = {}
             for protocol in ['HTTP/2.0', 'HTTP/3.0']:
                 protocol_std = delay_std[delay_std['Protocol'] == protocol].sort_values('NetworkDelay(ms)')
@@ -684,17 +1519,12 @@ def plot_total_time_comparison(df, output_dir):
             plot_single_graph(axes[0], x_data, y_data_dict, 
                              'ネットワーク遅延 (ms)', '平均Total Time (ms)', 
                              'Total Timeの比較 (帯域無制限)',
-                             COLORS, show_labels=True, fill_area=False, label_unit='ms', y_std_dict=y_std_dict if y_std_dict else None)
+                             COLORS, show_labels=True, fill_area=False, label_unit='ms', y_std_dict=y_std_dict if y_std_dict else None,
+                             dpi=RENDER_PROFILES[quality]['dpi'], y_band_dict=percentile_band_dict(stats[stats['Bandwidth'] == '0'], 'TotalTime(ms)'))
         
         # 右側のグラフ: 帯域幅による影響（遅延0msの場合）
-        bandwidth_data = df[df['NetworkDelay(ms)'] == 0].copy()
         bandwidth_order = ['100mbit', '10mbit', '5mbit', '3mbit', '2mbit', '1mbit', '0']
-        bandwidth_data['BandwidthOrder'] = bandwidth_data['Bandwidth'].apply(
-            lambda x: bandwidth_order.index(str(x)) if str(x) in bandwidth_order else 999
-        )
-        bandwidth_data = bandwidth_data.sort_values('BandwidthOrder')
-        
-        bw_grouped = bandwidth_data.groupby(['Protocol', 'Bandwidth'])['TotalTime(ms)'].mean().reset_index()
+        bw_grouped = condition_table(stats[stats['NetworkDelay(ms)'] == 0], 'mean')
         # BandwidthOrderを追加
         bw_grouped['BandwidthOrder'] = bw_grouped['Bandwidth'].apply(
             lambda x: bandwidth_order.index(str(x)) if str(x) in bandwidth_order else 999
@@ -739,176 +1569,384 @@ def plot_total_time_comparison(df, output_dir):
                 spine.set_color(COLORS['axis'])
     
     plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'total_time_comparison.png'), dpi=300, 
-                bbox_inches='tight', facecolor='white', pad_inches=0.2)
-    print(f"Saved: {output_dir}/total_time_comparison.png")
+    output_file = save_figure(output_dir, 'total_time_comparison', quality)
+    print(f"Saved: {output_file}")
     plt.close()
 
-def find_crossover_points(df, metric='TTFB(ms)'):
-    """HTTP2とHTTP3で性能が逆転する地点を特定"""
-    crossover_points = []
-    
-    # 帯域幅ごとに分析
+# 逆転地点を求めるメトリクスと保存先（セッションディレクトリ直下）
+CROSSOVER_POINTS_FILE = 'crossover_points.json'
+CROSSOVER_POINTS_VERSION = 6
+# 平均値に加えて逆転地点を求めるテール分位点
+TAIL_CROSSOVER_STAT = 'p99'
+
+def find_all_crossover_points(stats, metrics=CROSSOVER_METRICS, stat='mean'):
+    """全帯域幅・全メトリクスの逆転地点を一括で求める（{metric: [逆転地点, ...]}、statは比較する統計量）"""
+    crossover_points = {metric: [] for metric in metrics}
+    
+    # 平均値（またはstat）を (帯域幅, 遅延) × (メトリクス, プロトコル) の表に展開
+    values = condition_table(stats, stat)
+    values = values[values['Protocol'].isin(['HTTP/2.0', 'HTTP/3.0'])]
+    if values.empty:
+        return crossover_points
     # Bandwidthを文字列に統一してからソート
-    unique_bandwidths = [str(bw) for bw in df['Bandwidth'].unique()]
-    unique_bandwidths = sorted(set(unique_bandwidths))
-    for bandwidth in unique_bandwidths:
-        # 文字列に統一されたbandwidthでフィルタリング
-        bw_data = df[df['Bandwidth'].astype(str) == bandwidth]
-        
-        # 遅延ごとに平均値を計算
-        delays = sorted(bw_data['NetworkDelay(ms)'].unique())
-        
-        if len(delays) < 2:
-            continue
-        
-        http2_values = []
-        http3_values = []
-        delay_list = []
-        
-        for delay in delays:
-            delay_data = bw_data[bw_data['NetworkDelay(ms)'] == delay]
-            http2_data = delay_data[delay_data['Protocol'] == 'HTTP/2.0']
-            http3_data = delay_data[delay_data['Protocol'] == 'HTTP/3.0']
-            
-            if len(http2_data) > 0 and len(http3_data) > 0:
-                http2_mean = http2_data[metric].mean()
-                http3_mean = http3_data[metric].mean()
-                
-                if not pd.isna(http2_mean) and not pd.isna(http3_mean):
-                    http2_values.append(http2_mean)
-                    http3_values.append(http3_mean)
-                    delay_list.append(delay)
-        
-        if len(http2_values) < 2:
+    values = values.assign(Bandwidth=values['Bandwidth'].astype(str))
+    pivot = values.set_index(['Bandwidth', 'NetworkDelay(ms)', 'Protocol'])[list(metrics)].unstack('Protocol').sort_index()
+    bandwidths = pivot.index.get_level_values('Bandwidth').to_numpy()
+    delays = pivot.index.get_level_values('NetworkDelay(ms)').to_numpy(dtype=float)
+    sketch_stats = [quantile_column(q) for q in SKETCH_QUANTILES]
+    
+    for metric in metrics:
+        if (metric, 'HTTP/2.0') not in pivot.columns or (metric, 'HTTP/3.0') not in pivot.columns:
             continue
-        
-        # 逆転地点を探す
-        prev_http2_better = None
-        for i in range(len(delay_list)):
-            http2_better = http2_values[i] < http3_values[i]
-            
-            if prev_http2_better is not None and prev_http2_better != http2_better:
-                # 逆転が発生
-                crossover_delay = delay_list[i]
-                if i > 0:
-                    prev_delay = delay_list[i-1]
-                    # 線形補間でより正確な逆転地点を推定
-                    prev_diff = http2_values[i-1] - http3_values[i-1]
-                    curr_diff = http2_values[i] - http3_values[i]
-                    
-                    if prev_diff != curr_diff:
-                        # 線形補間で0になる点を計算
-                        ratio = abs(prev_diff) / abs(prev_diff - curr_diff) if (prev_diff - curr_diff) != 0 else 0.5
-                        estimated_delay = prev_delay + (crossover_delay - prev_delay) * ratio
-                    else:
-                        estimated_delay = (prev_delay + crossover_delay) / 2
-                else:
-                    estimated_delay = crossover_delay
-                
-                crossover_points.append({
-                    'bandwidth': bandwidth,
-                    'delay': estimated_delay,
-                    'metric': metric,
-                    'http2_value': http2_values[i],
-                    'http3_value': http3_values[i],
-                    'direction': 'HTTP/3優位→HTTP/2優位' if prev_http2_better else 'HTTP/2優位→HTTP/3優位'
-                })
-            
-            prev_http2_better = http2_better
+        http2 = pivot[(metric, 'HTTP/2.0')].to_numpy(dtype=float)
+        http3 = pivot[(metric, 'HTTP/3.0')].to_numpy(dtype=float)
+        
+        # 両プロトコルの値がある遅延だけを使う
+        valid = ~np.isnan(http2) & ~np.isnan(http3)
+        if stat in sketch_stats:
+            # スケッチの分位点は相対誤差 SKETCH_RELATIVE_ACCURACY の分解能しかないため、その範囲の差は優劣なし（同値）として
+            # 飛ばし、前後の遅延の間で優劣が入れ替わったかを見る（同じバケットに入っただけで逆転地点にしない）
+            valid &= np.abs(http2 - http3) > SKETCH_RELATIVE_ACCURACY * (np.abs(http2) + np.abs(http3))
+        bw, delay, http2, http3 = bandwidths[valid], delays[valid], http2[valid], http3[valid]
+        diff = http2 - http3
+        http2_better = http2 < http3
+        
+        # 同じ帯域幅内で隣り合う遅延の間で優劣が入れ替わる位置
+        crossing = np.nonzero((bw[1:] == bw[:-1]) & (http2_better[1:] != http2_better[:-1]))[0] + 1
+        prev_diff = diff[crossing - 1]
+        curr_diff = diff[crossing]
+        prev_delay = delay[crossing - 1]
+        curr_delay = delay[crossing]
+        
+        # 線形補間で差が0になる遅延を推定
+        denominator = np.abs(prev_diff - curr_diff)
+        ratio = np.divide(np.abs(prev_diff), denominator, out=np.full(len(crossing), 0.5), where=denominator != 0)
+        estimated = np.where(prev_diff != curr_diff,
+                             prev_delay + (curr_delay - prev_delay) * ratio,
+                             (prev_delay + curr_delay) / 2)
+        
+        for i, idx in enumerate(crossing):
+            crossover_points[metric].append({
+                'bandwidth': bw[idx],
+                'delay': estimated[i],
+                'metric': metric,
+                'http2_value': http2[idx],
+                'http3_value': http3[idx],
+                'direction': 'HTTP/3優位→HTTP/2優位' if http2_better[idx - 1] else 'HTTP/2優位→HTTP/3優位'
+            })
     
     return crossover_points
 
-def consolidate_bandwidth_csv(results_dir, bandwidth, output_dir, df=None):
-    """帯域幅ごとのCSVファイルを集約してbenchmark_results.csvを作成"""
-    bandwidth_name = bandwidth if bandwidth != '0' else '無制限'
-    if bandwidth == '0':
-        bandwidth_name = '無制限'
-    elif bandwidth == '1mbit':
-        bandwidth_name = '1Mbps'
-    elif bandwidth == '2mbit':
-        bandwidth_name = '2Mbps'
-    elif bandwidth == '3mbit':
-        bandwidth_name = '3Mbps'
-    
-    all_dataframes = []
-    
-    # 方法1: DataFrameが提供されている場合はそれを使用
-    if df is not None:
-        bw_data = df[df['Bandwidth'] == bandwidth]
-        if len(bw_data) > 0:
-            all_dataframes.append(bw_data)
-    
-    # 方法2: Experiment/◯ms/からCSVファイルを探す（新しい構造）
-    experiment_dir = os.path.join(results_dir, bandwidth_name, 'Experiment')
-    if os.path.exists(experiment_dir):
-        for delay_dir in sorted(os.listdir(experiment_dir)):
-            delay_path = os.path.join(experiment_dir, delay_dir)
-            if not os.path.isdir(delay_path):
+def bootstrap_means(sample, rng, resamples=BOOTSTRAP_RESAMPLES, total=None):
+    """条件全体の平均値のばらつきを、標本を復元抽出した平均値で resamples 回分まとめて求める（totalは全体の (件数, 平均値)）"""
+    n = len(sample)
+    count, mean = total if total is not None else (n, sample.mean())
+    m = min(n, BOOTSTRAP_RESAMPLE_SIZE)
+    batch = max(1, BOOTSTRAP_BATCH_ELEMENTS // m)
+    means = np.empty(resamples)
+    for start in range(0, resamples, batch):
+        stop = min(start + batch, resamples)
+        means[start:stop] = sample[rng.integers(0, n, size=(stop - start, m))].mean(axis=1)
+    if m == count:
+        return means
+    # 標本は全体からの一様抽出なので、m件の平均値の標本平均からのずれを全体の件数の分（sqrt(m/count)倍）に縮め、
+    # 全体の平均値を中心にする（標本の件数ではなく全体の件数で換算しないと信頼区間が sqrt(count/n) 倍広くなる）
+    return mean + (means - sample.mean()) * np.sqrt(m / max(count, m))
+
+def bootstrap_crossover_points(samples, crossovers, metrics=CROSSOVER_METRICS, totals=None):
+    """ブートストラップで各逆転地点の信頼区間と、帯域幅ごとの逆転地点の存在確率を求める"""
+    rng = np.random.default_rng(BOOTSTRAP_SEED)
+    alpha = (1 - BOOTSTRAP_CONFIDENCE) / 2
+    probability = {metric: {} for metric in metrics}
+    bandwidths = sorted({str(key[2]) for key in samples})
+    
+    def cell_sample(protocol, delay, bandwidth, metric):
+        return samples.get((protocol, delay, bandwidth), {}).get(metric, np.empty(0))
+    
+    def cell_means(protocol, delay, bandwidth, metric):
+        total = (totals or {}).get((protocol, delay, bandwidth), {}).get(metric)
+        return bootstrap_means(cell_sample(protocol, delay, bandwidth, metric), rng, total=total)
+    
+    for metric in metrics:
+        for bandwidth in bandwidths:
+            # 両プロトコルの標本がある遅延だけを使う
+            delays = sorted(delay for protocol, delay, bw in samples
+                            if protocol == 'HTTP/2.0' and str(bw) == bandwidth
+                            and len(cell_sample('HTTP/2.0', delay, bw, metric)) > 0
+                            and len(cell_sample('HTTP/3.0', delay, bw, metric)) > 0)
+            if len(delays) < 2:
                 continue
+            bw = next(key[2] for key in samples if str(key[2]) == bandwidth)
             
-            http2_file = os.path.join(delay_path, 'http2_results.csv')
-            http3_file = os.path.join(delay_path, 'http3_results.csv')
+            # 再標本化した平均値（再標本化の回数 × 遅延）
+            http2 = np.column_stack([cell_means('HTTP/2.0', delay, bw, metric) for delay in delays])
+            http3 = np.column_stack([cell_means('HTTP/3.0', delay, bw, metric) for delay in delays])
+            diff = http2 - http3
+            http2_better = http2 < http3
             
-            for csv_file in [http2_file, http3_file]:
-                if os.path.exists(csv_file):
-                    try:
-                        csv_df = pd.read_csv(csv_file)
-                        # DataFrameから既に読み込んだデータと重複しないようにチェック
-                        if df is None or len(csv_df) > 0:
-                            all_dataframes.append(csv_df)
-                    except Exception as e:
-                        print(f"Warning: Failed to read {csv_file}: {e}")
-    
-    # 方法3: 古い構造（delay_◯ms/）からCSVファイルを探す
-    if not all_dataframes:
-        # 帯域幅に基づいて古い構造のディレクトリを探す
-        for item in os.listdir(results_dir):
-            item_path = os.path.join(results_dir, item)
-            if not os.path.isdir(item_path) or not item.startswith('delay_'):
-                continue
+            # find_all_crossover_points と同じ判定・線形補間を全ての再標本化について一括で行う
+            changed = http2_better[:, 1:] != http2_better[:, :-1]
+            prev_diff, curr_diff = diff[:, :-1], diff[:, 1:]
+            delay_values = np.asarray(delays, dtype=float)
+            prev_delay, curr_delay = delay_values[:-1], delay_values[1:]
+            denominator = np.abs(prev_diff - curr_diff)
+            ratio = np.divide(np.abs(prev_diff), denominator, out=np.full(prev_diff.shape, 0.5), where=denominator != 0)
+            estimated = np.where(prev_diff != curr_diff,
+                                 prev_delay + (curr_delay - prev_delay) * ratio,
+                                 (prev_delay + curr_delay) / 2)
             
-            # experiment_info.txtから帯域幅を確認
-            exp_info = os.path.join(item_path, 'experiment_info.txt')
-            if os.path.exists(exp_info):
-                try:
-                    with open(exp_info, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        # 帯域幅が一致するか確認
-                        if (bandwidth == '0' and ('Bandwidth Limit: 0' in content or 'Bandwidth Limit: 無' in content)) or \
-                           (bandwidth != '0' and f'Bandwidth Limit: {bandwidth}' in content):
-                            http2_file = os.path.join(item_path, 'http2_results.csv')
-                            http3_file = os.path.join(item_path, 'http3_results.csv')
-                            
-                            for csv_file in [http2_file, http3_file]:
-                                if os.path.exists(csv_file):
-                                    try:
-                                        csv_df = pd.read_csv(csv_file)
-                                        all_dataframes.append(csv_df)
-                                    except Exception as e:
-                                        print(f"Warning: Failed to read {csv_file}: {e}")
-                except Exception as e:
-                    print(f"Warning: Failed to read {exp_info}: {e}")
+            probability[metric][bandwidth] = float(changed.any(axis=1).mean())
+            
+            for cp in crossovers.get(metric, []):
+                if cp['bandwidth'] != bandwidth:
+                    continue
+                # 同じ向きの逆転のうち、元のデータから求めた逆転地点に最も近いものを対応させる
+                from_http2 = cp['direction'] == 'HTTP/3優位→HTTP/2優位'
+                matched = changed & (http2_better[:, :-1] == from_http2)
+                found = matched.any(axis=1)
+                distance = np.where(matched, np.abs(estimated - cp['delay']), np.inf)
+                nearest = estimated[np.arange(len(estimated)), distance.argmin(axis=1)][found]
+                cp['support'] = float(found.mean())
+                cp['delay_ci'] = None
+                if found.any():
+                    low, high = float(np.quantile(nearest, alpha)), float(np.quantile(nearest, 1 - alpha))
+                    # 再標本化で逆転地点が偏ると区間が推定遅延を含まないことがあるため、推定遅延まで広げて印を付ける
+                    cp['delay_ci_widened'] = not low <= cp['delay'] <= high
+                    cp['delay_ci'] = [min(low, cp['delay']), max(high, cp['delay'])]
+    
+    return probability
+
+def find_crossover_points(stats, metric='TTFB(ms)'):
+    """HTTP2とHTTP3で性能が逆転する地点を特定"""
+    return find_all_crossover_points(stats, (metric,))[metric]
+
+def dataset_fingerprint(stats):
+    """条件別平均値（とテール分位点）から計算するデータセットのフィンガープリント"""
+    digest = hashlib.sha256()
+    for stat in ('mean', TAIL_CROSSOVER_STAT):
+        digest.update(pd.util.hash_pandas_object(condition_table(stats, stat), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def crossover_records(found):
+    """逆転地点をJSONに保存できる形式に変換する"""
+    return {
+        metric: [{
+            'bandwidth': str(cp['bandwidth']),
+            'delay': float(cp['delay']),
+            'metric': cp['metric'],
+            'http2_value': float(cp['http2_value']),
+            'http3_value': float(cp['http3_value']),
+            'direction': cp['direction'],
+        } for cp in points]
+        for metric, points in found.items()
+    }
+
+def load_crossover_points(cube, results_dir=None):
+    """逆転地点をデータセットごとに一度だけ計算し、キューブとJSON（crossover_points.json）に保存する"""
+    if 'crossovers' in cube:
+        return cube['crossovers']
     
-    if not all_dataframes:
-        print(f"Warning: No CSV files found for {bandwidth_name}")
-        return None
+    fingerprint = dataset_fingerprint(cube['cells'])
+    json_path = os.path.join(results_dir, CROSSOVER_POINTS_FILE) if results_dir else None
     
-    # すべてのデータを結合（重複を除去）
-    consolidated_df = pd.concat(all_dataframes, ignore_index=True)
-    # 重複行を除去（同じRequestTimeとProtocolの組み合わせ）
-    if 'RequestTime' in consolidated_df.columns:
-        consolidated_df = consolidated_df.drop_duplicates(subset=['Protocol', 'RequestTime'], keep='first')
+    # 前回の実行と同じデータであれば保存済みの結果を使う
+    crossovers = None
+    if json_path and os.path.exists(json_path):
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('version') == CROSSOVER_POINTS_VERSION and saved.get('fingerprint') == fingerprint:
+                crossovers, probability, tail_crossovers = saved['crossovers'], saved['probability'], saved['tail_crossovers']
+        except (json.JSONDecodeError, KeyError, AttributeError) as e:
+            # 壊れた（書き込み途中で中断された）ファイルは保存済みの結果がないものとして計算し直す
+            print(f"Warning: Ignoring invalid {json_path}, recomputing crossover points: {e}")
+        except Exception as e:
+            print(f"Warning: Failed to read {json_path}: {e}")
+    
+    if crossovers is None:
+        crossovers = crossover_records(find_all_crossover_points(cube['cells'], CROSSOVER_METRICS))
+        # 逆転地点の信頼区間（delay_ci）・再現率（support）と、帯域幅ごとの逆転地点の存在確率
+        probability = bootstrap_crossover_points(cube.get('samples', {}), crossovers, totals=cube.get('sample_totals'))
+        # テール（p99）同士で比較した逆転地点
+        tail_crossovers = crossover_records(find_all_crossover_points(cube['cells'], CROSSOVER_METRICS, TAIL_CROSSOVER_STAT))
+        if json_path:
+            try:
+                # 他のツールが書き込み途中のファイルを読まないよう一時ファイル経由で置き換える
+                tmp_path = json_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'version': CROSSOVER_POINTS_VERSION, 'fingerprint': fingerprint,
+                               'crossovers': crossovers, 'probability': probability,
+                               'tail_stat': TAIL_CROSSOVER_STAT, 'tail_crossovers': tail_crossovers},
+                              f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, json_path)
+                print(f"Saved: {json_path}")
+            except Exception as e:
+                print(f"Warning: Failed to write {json_path}: {e}")
     
-    # benchmark_results.csvとして保存
-    output_file = os.path.join(output_dir, 'benchmark_results.csv')
-    consolidated_df.to_csv(output_file, index=False)
-    print(f"Saved: {output_file} ({len(consolidated_df)} records)")
+    cube['crossovers'] = crossovers
+    cube['crossover_probability'] = probability
+    cube['tail_crossovers'] = tail_crossovers
+    return crossovers
+
+def cube_crossover_points(cube, metric, bandwidth=None, tail=False):
+    """集計キューブに保存された逆転地点を取り出す（帯域幅で絞り込み可、tail=Trueはp99同士の逆転地点）"""
+    load_crossover_points(cube)
+    crossovers = cube['tail_crossovers'] if tail else cube['crossovers']
+    if metric not in crossovers:
+        crossovers[metric] = find_all_crossover_points(cube['cells'], (metric,), TAIL_CROSSOVER_STAT if tail else 'mean')[metric]
+    return [cp for cp in crossovers[metric] if bandwidth is None or cp['bandwidth'] == bandwidth]
+
+def cube_crossover_probability(cube, metric, bandwidth):
+    """帯域幅ごとの逆転地点の存在確率（ブートストラップ、求められない場合はNone）"""
+    load_crossover_points(cube)
+    return cube.get('crossover_probability', {}).get(metric, {}).get(bandwidth)
+
+# 帯域幅ごとに全遅延条件の結果CSVをまとめたファイル（各帯域幅ディレクトリ直下）
+CONSOLIDATED_RESULTS_FILE = 'benchmark_results.csv'
+
+def format_request_time(request_time):
+    """解析済みのRequestTimeをmetrics.goと同じRFC3339形式（UTC）の文字列に戻す（欠損は空文字）"""
+    values = request_time.dt.tz_convert(None).to_numpy() if request_time.dt.tz is not None else request_time.to_numpy()
+    # 小数部の末尾の0と、0だけの小数部は省く（Goの RFC3339Nano と同じ。unit='auto' はミリ秒単位や日付だけに丸めるため使わない）
+    text = np.char.rstrip(np.char.rstrip(np.datetime_as_string(values.astype('datetime64[ns]'), unit='ns'), '0'), '.')
+    text = np.char.add(text, 'Z')
+    return np.where(request_time.isna().to_numpy(), '', text)
+
+# metrics.go が書き出す小数の桁数（fmt.Sprintf の %.3f・%.2f）
+RESULT_CSV_DECIMALS = {'TTFB(ms)': 3, 'TotalTime(ms)': 3, 'Throughput(KB/s)': 2}
+
+def format_fixed(values, decimals):
+    """小数を metrics.go と同じ固定小数点の文字列にする（NaN・±InfもGoの表記に合わせる）"""
+    values = values.to_numpy(dtype='float64', na_value=np.nan)
+    text = np.char.mod(f'%.{decimals}f', values)
+    text = np.where(np.isnan(values), 'NaN', text)
+    return np.where(np.isinf(values), np.where(values > 0, '+Inf', '-Inf'), text)
+
+def write_results_csv(frame, path):
+    """結果を metrics.go と同じ形式のCSVに書き出す（小数の桁数をそろえ、引用符は必要な値だけに付ける）"""
+    formatted = {column: format_fixed(frame[column], decimals)
+                 for column, decimals in RESULT_CSV_DECIMALS.items() if column in frame.columns}
+    tmp_path = path + '.tmp'
+    frame.assign(**formatted).to_csv(tmp_path, index=False, lineterminator='\n')
+    os.replace(tmp_path, path)
+
+def consolidate_results(df, results_dir, manifest=None):
+    """読み込み済みの結果を帯域幅ごとにまとめてbenchmark_results.csvを作成し、出力ごとの入力ハッシュを返す"""
+    manifest = manifest or {}
+    generator = generator_fingerprint()
+    columns = [column for column in RESULT_CSV_COLUMNS if column in df.columns]
+    outputs = {}
+    
+    # 帯域幅ごとの切り出しはgroupbyの1回の走査で行い、CSVは読み直さない
+    for bandwidth, bw_df in df.groupby('Bandwidth', observed=True, sort=True):
+        bandwidth_name = bandwidth_display_name(str(bandwidth))
+        output_file = os.path.join(results_dir, bandwidth_name, CONSOLIDATED_RESULTS_FILE)
+        
+        # 同じリクエストが複数のCSVに含まれる場合（古い構造と新しい構造の併存など）は、
+        # 解析済みのRequestTimeとProtocol・遅延で重複を除く（RequestTimeが欠損した行は全て残す）
+        bw_df = bw_df[columns]
+        if 'RequestTime' in columns:
+            keys = [column for column in ('Protocol', 'NetworkDelay(ms)', 'RequestTime') if column in columns]
+            duplicated = bw_df.duplicated(subset=keys, keep='first') & bw_df['RequestTime'].notna()
+            bw_df = bw_df[~duplicated]
+        
+        # キャッシュの有無で読み込み順が変わっても同じ内容になるよう並べ替える
+        order = [column for column in ('NetworkDelay(ms)', 'Protocol', 'RequestTime') if column in columns]
+        bw_df = bw_df.sort_values(order, kind='stable', ignore_index=True)
+        
+        rel_path = os.path.relpath(output_file, results_dir)
+        fingerprint = hashlib.sha256(f"{generator}:{frame_fingerprint(bw_df)}".encode('utf-8')).hexdigest()
+        if os.path.exists(output_file) and manifest.get(rel_path) == fingerprint:
+            print(f"Skipping {rel_path} (inputs unchanged)")
+            outputs[rel_path] = fingerprint
+            continue
+        
+        try:
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            if 'RequestTime' in columns:
+                bw_df = bw_df.assign(RequestTime=format_request_time(bw_df['RequestTime']))
+            write_results_csv(bw_df, output_file)
+            print(f"Saved: {output_file} ({len(bw_df)} records)")
+            outputs[rel_path] = fingerprint
+        except Exception as e:
+            print(f"Warning: Failed to write {output_file}: {e}")
     
-    return consolidated_df
+    return outputs
 
-def generate_bandwidth_report(df, bandwidth, output_dir):
+# Arrow IPC（Feather v2）形式の書き出し（セッションディレクトリ直下、非圧縮のためメモリマップで読める）
+SESSION_DATA_FILE = 'session_data.arrow'
+AGGREGATE_CUBE_FILE = 'aggregate_cube.arrow'
+ARROW_EXPORT_VERSION = 1
+# コマンドラインでセッションディレクトリの代わりに指定できるファイル
+ARROW_FILE_SUFFIXES = ('.arrow', '.feather')
+CUBE_LEVELS = ('cells', 'bandwidth', 'protocol')
+
+def flatten_cube(cube):
+    """集計キューブの3つの表を1つの表にまとめる（Level列で区別し、統計量の列は '<メトリクス>_<統計量>'）"""
+    tables = []
+    for level in CUBE_LEVELS:
+        table = cube[level]
+        flat = pd.DataFrame({'Level': level}, index=table.index)
+        for name in CONDITION_KEYS:
+            flat[name] = table[(name, '')] if (name, '') in table.columns else None
+        for metric, stat in table.columns:
+            if stat != '':
+                flat[f'{metric}_{stat}'] = table[(metric, stat)]
+        tables.append(flat)
+    flat = pd.concat(tables, ignore_index=True)
+    return flat.astype({'Level': 'category', 'Protocol': 'category', 'Bandwidth': 'category',
+                        'NetworkDelay(ms)': 'Int16'})
+
+def write_arrow_table(frame, path, metadata):
+    """DataFrameを型付きのスキーマのまま非圧縮のArrow IPCファイルに書き出す"""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[b'analyze_results'] = json.dumps(metadata, ensure_ascii=False).encode('utf-8')
+    # 読み込み中のプロセスがメモリマップしていても壊れないよう一時ファイル経由で置き換える
+    feather.write_feather(table.replace_schema_metadata(schema_metadata), path + '.tmp', compression='uncompressed')
+    os.replace(path + '.tmp', path)
+
+def export_session_arrow(df, cube, results_dir, manifest=None):
+    """リクエスト単位の結果と集計キューブをArrow IPCファイルに書き出し、出力ごとの入力ハッシュを返す"""
+    if not _pyarrow_available():
+        print(f"Warning: pyarrow is not installed, skipping {SESSION_DATA_FILE} and {AGGREGATE_CUBE_FILE}")
+        return {}
+    
+    manifest = manifest or {}
+    generator = generator_fingerprint()
+    metadata = {'version': ARROW_EXPORT_VERSION, 'session': os.path.basename(os.path.abspath(results_dir))}
+    outputs = {}
+    for filename, frame in ((SESSION_DATA_FILE, df), (AGGREGATE_CUBE_FILE, flatten_cube(cube))):
+        output_file = os.path.join(results_dir, filename)
+        fingerprint = hashlib.sha256(f"{generator}:{frame_fingerprint(frame)}".encode('utf-8')).hexdigest()
+        if os.path.exists(output_file) and manifest.get(filename) == fingerprint:
+            print(f"Skipping {filename} (inputs unchanged)")
+            outputs[filename] = fingerprint
+            continue
+        try:
+            write_arrow_table(frame, output_file, metadata)
+            print(f"Saved: {output_file} ({len(frame)} records)")
+            outputs[filename] = fingerprint
+        except Exception as e:
+            print(f"Warning: Failed to write {output_file}: {e}")
+    return outputs
+
+def read_arrow_results(path, bandwidths=None, delays=None):
+    """export_session_arrow で書き出したリクエスト単位の結果を読み込む（CSVを解析しない）"""
+    import pyarrow.feather as feather
+    df = apply_result_schema(feather.read_table(path, memory_map=True).to_pandas())
+    if bandwidths is not None:
+        values = {BANDWIDTH_DIR_MAPPING.get(str(bandwidth), str(bandwidth)) for bandwidth in bandwidths}
+        df = df[df['Bandwidth'].astype(str).isin(values)]
+    if delays is not None:
+        df = df[df['NetworkDelay(ms)'].isin(delays)]
+    return df.reset_index(drop=True)
+
+def generate_bandwidth_report(cube, bandwidth, output_dir):
     """帯域幅ごとのサマリーレポートを生成（summary_report.txt）"""
+    stats = cube['cells']
     bandwidth_name = bandwidth if bandwidth != '0' else '無制限'
     if bandwidth == '0':
         bandwidth_name = '無制限'
@@ -923,7 +1961,7 @@ def generate_bandwidth_report(df, bandwidth, output_dir):
     
     report_path = os.path.join(output_dir, 'summary_report.txt')
     
-    bw_data = df[df['Bandwidth'] == bandwidth]
+    bw_stats = stats[stats['Bandwidth'] == bandwidth]
     
     with open(report_path, 'w', encoding='utf-8') as f:
         f.write("=" * 80 + "\n")
@@ -934,19 +1972,20 @@ def generate_bandwidth_report(df, bandwidth, output_dir):
         f.write(f"Bandwidth Condition: {bandwidth_name}\n")
         f.write("-" * 80 + "\n")
         for protocol in ['HTTP/2.0', 'HTTP/3.0']:
-            protocol_data = bw_data[bw_data['Protocol'] == protocol]
-            if len(protocol_data) > 0:
+            row = cube_row(cube['bandwidth'], Protocol=protocol, Bandwidth=bandwidth)
+            if row is not None:
                 f.write(f"\n{protocol}:\n")
-                f.write(f"  Total Requests: {len(protocol_data)}\n")
-                f.write(f"  TTFB (avg): {protocol_data['TTFB(ms)'].mean():.3f} ms\n")
-                f.write(f"  Total Time (avg): {protocol_data['TotalTime(ms)'].mean():.3f} ms\n")
-                f.write(f"  Throughput (avg): {protocol_data['Throughput(KB/s)'].mean():.2f} KB/s\n")
+                f.write(f"  Total Requests: {row[('TTFB(ms)', 'count')]}\n")
+                f.write(f"  TTFB (avg): {row[('TTFB(ms)', 'mean')]:.3f} ms\n")
+                f.write(f"  Total Time (avg): {row[('TotalTime(ms)', 'mean')]:.3f} ms\n")
+                f.write(f"  Throughput (avg): {row[('Throughput(KB/s)', 'mean')]:.2f} KB/s\n")
         
         # 遅延ごとの勝者判定
         f.write("\n\nPerformance by Delay:\n")
         f.write("-" * 80 + "\n")
-        for delay in sorted(bw_data['NetworkDelay(ms)'].unique()):
-            delay_data = bw_data[bw_data['NetworkDelay(ms)'] == delay]
+        bw_means = condition_table(bw_stats, 'mean')
+        for delay in sorted(bw_means['NetworkDelay(ms)'].unique()):
+            delay_data = bw_means[bw_means['NetworkDelay(ms)'] == delay]
             if len(delay_data) == 0:
                 continue
             
@@ -954,10 +1993,10 @@ def generate_bandwidth_report(df, bandwidth, output_dir):
             http3_data = delay_data[delay_data['Protocol'] == 'HTTP/3.0']
             
             if len(http2_data) > 0 and len(http3_data) > 0:
-                http2_ttfb = http2_data['TTFB(ms)'].mean()
-                http3_ttfb = http3_data['TTFB(ms)'].mean()
-                http2_total = http2_data['TotalTime(ms)'].mean()
-                http3_total = http3_data['TotalTime(ms)'].mean()
+                http2_ttfb = http2_data['TTFB(ms)'].iloc[0]
+                http3_ttfb = http3_data['TTFB(ms)'].iloc[0]
+                http2_total = http2_data['TotalTime(ms)'].iloc[0]
+                http3_total = http3_data['TotalTime(ms)'].iloc[0]
                 
                 if not pd.isna(http2_ttfb) and not pd.isna(http3_ttfb):
                     winner_ttfb = 'HTTP/2.0' if http2_ttfb < http3_ttfb else 'HTTP/3.0'
@@ -977,7 +2016,7 @@ def generate_bandwidth_report(df, bandwidth, output_dir):
         f.write("=" * 80 + "\n")
         
         # TTFBの逆転地点
-        ttfb_crossovers = find_crossover_points(bw_data, 'TTFB(ms)')
+        ttfb_crossovers = cube_crossover_points(cube, 'TTFB(ms)', bandwidth)
         if ttfb_crossovers:
             f.write("\nTTFB (Time To First Byte):\n")
             for cp in ttfb_crossovers:
@@ -989,7 +2028,7 @@ def generate_bandwidth_report(df, bandwidth, output_dir):
             f.write("\nTTFB: 逆転地点は見つかりませんでした\n")
         
         # Total Timeの逆転地点
-        total_crossovers = find_crossover_points(bw_data, 'TotalTime(ms)')
+        total_crossovers = cube_crossover_points(cube, 'TotalTime(ms)', bandwidth)
         if total_crossovers:
             f.write("\nTotal Time:\n")
             for cp in total_crossovers:
@@ -1002,8 +2041,10 @@ def generate_bandwidth_report(df, bandwidth, output_dir):
     
     print(f"Saved: {report_path}")
 
-def plot_bandwidth_ttfb_comparison(df, bandwidth, output_dir):
+def plot_bandwidth_ttfb_comparison(cube, bandwidth, output_dir, quality=DEFAULT_QUALITY):
     """帯域幅ごとのTTFB比較グラフを生成（帯域幅ディレクトリ直下に）"""
+    load_plotting()
+    stats = cube['cells']
     bandwidth_name = bandwidth if bandwidth != '0' else '無制限'
     if bandwidth == '0':
         bandwidth_name = '無制限'
@@ -1015,13 +2056,13 @@ def plot_bandwidth_ttfb_comparison(df, bandwidth, output_dir):
         bandwidth_name = '3Mbps'
     
     # 文字列に統一されたbandwidthでフィルタリング
-    bw_data = df[df['Bandwidth'].astype(str) == bandwidth]
+    bw_stats = stats[stats['Bandwidth'] == bandwidth]
     
     # TTFBの比較グラフを生成
     fig, ax = plt.subplots(1, 1, figsize=(12, 8))
     fig.patch.set_facecolor(COLORS['background'])
     
-    delay_data = bw_data.groupby(['Protocol', 'NetworkDelay(ms)'])['TTFB(ms)'].mean().reset_index()
+    delay_data = condition_table(bw_stats, 'mean')
     
     # データを整理
     y_data_dict = {}
@@ -1036,7 +2077,7 @@ def plot_bandwidth_ttfb_comparison(df, bandwidth, output_dir):
     
     if x_data is not None and len(y_data_dict) > 0:
         # 標準偏差を計算
-        delay_std = bw_data.groupby(['Protocol', 'NetworkDelay(ms)'])['TTFB(ms)'].std().reset_index()
+        delay_std = condition_table(bw_stats, 'std')
         y_std_dict = {}
         for protocol in ['HTTP/2.0', 'HTTP/3.0']:
             protocol_std = delay_std[delay_std['Protocol'] == protocol].sort_values('NetworkDelay(ms)')
@@ -1046,17 +2087,18 @@ def plot_bandwidth_ttfb_comparison(df, bandwidth, output_dir):
         plot_single_graph(ax, x_data, y_data_dict, 
                          'ネットワーク遅延 (ms)', '平均TTFB (ms)', 
                          f'TTFB比較 - {bandwidth_name}',
-                         COLORS, show_labels=True, fill_area=False, label_unit='ms', y_std_dict=y_std_dict if y_std_dict else None)
+                         COLORS, show_labels=True, fill_area=False, label_unit='ms', y_std_dict=y_std_dict if y_std_dict else None,
+                         dpi=RENDER_PROFILES[quality]['dpi'], y_band_dict=percentile_band_dict(bw_stats, 'TTFB(ms)'))
     
     plt.tight_layout()
-    output_file = os.path.join(output_dir, 'ttfb_comparison.png')
-    plt.savefig(output_file, dpi=300, 
-                bbox_inches='tight', facecolor='white', pad_inches=0.2)
+    output_file = save_figure(output_dir, 'ttfb_comparison', quality)
     print(f"Saved: {output_file}")
     plt.close()
 
-def plot_bandwidth_response_time_comparison(df, bandwidth, output_dir):
+def plot_bandwidth_response_time_comparison(cube, bandwidth, output_dir, quality=DEFAULT_QUALITY):
     """帯域幅ごとのResponse Time（Total Time）比較グラフを生成（帯域幅ディレクトリ直下に）"""
+    load_plotting()
+    stats = cube['cells']
     bandwidth_name = bandwidth if bandwidth != '0' else '無制限'
     if bandwidth == '0':
         bandwidth_name = '無制限'
@@ -1068,13 +2110,13 @@ def plot_bandwidth_response_time_comparison(df, bandwidth, output_dir):
         bandwidth_name = '3Mbps'
     
     # 文字列に統一されたbandwidthでフィルタリング
-    bw_data = df[df['Bandwidth'].astype(str) == bandwidth]
+    bw_stats = stats[stats['Bandwidth'] == bandwidth]
     
     # Total Timeの比較グラフを生成
     fig, ax = plt.subplots(1, 1, figsize=(12, 8))
     fig.patch.set_facecolor(COLORS['background'])
     
-    delay_data = bw_data.groupby(['Protocol', 'NetworkDelay(ms)'])['TotalTime(ms)'].mean().reset_index()
+    delay_data = condition_table(bw_stats, 'mean')
     
     # データを整理
     y_data_dict = {}
@@ -1089,7 +2131,7 @@ def plot_bandwidth_response_time_comparison(df, bandwidth, output_dir):
     
     if x_data is not None and len(y_data_dict) > 0:
         # 標準偏差を計算
-        delay_std = bw_data.groupby(['Protocol', 'NetworkDelay(ms)'])['TotalTime(ms)'].std().reset_index()
+        delay_std = condition_table(bw_stats, 'std')
         y_std_dict = {}
         for protocol in ['HTTP/2.0', 'HTTP/3.0']:
             protocol_std = delay_std[delay_std['Protocol'] == protocol].sort_values('NetworkDelay(ms)')
@@ -1099,17 +2141,18 @@ def plot_bandwidth_response_time_comparison(df, bandwidth, output_dir):
         plot_single_graph(ax, x_data, y_data_dict, 
                          'ネットワーク遅延 (ms)', '平均Response Time (ms)', 
                          f'Response Time比較 - {bandwidth_name}',
-                         COLORS, show_labels=True, fill_area=False, label_unit='ms', y_std_dict=y_std_dict if y_std_dict else None)
+                         COLORS, show_labels=True, fill_area=False, label_unit='ms', y_std_dict=y_std_dict if y_std_dict else None,
+                         dpi=RENDER_PROFILES[quality]['dpi'], y_band_dict=percentile_band_dict(bw_stats, 'TotalTime(ms)'))
     
     plt.tight_layout()
-    output_file = os.path.join(output_dir, 'response_time_comparison.png')
-    plt.savefig(output_file, dpi=300, 
-                bbox_inches='tight', facecolor='white', pad_inches=0.2)
+    output_file = save_figure(output_dir, 'response_time_comparison', quality)
     print(f"Saved: {output_file}")
     plt.close()
 
-def plot_bandwidth_throughput_comparison(df, bandwidth, output_dir):
+def plot_bandwidth_throughput_comparison(cube, bandwidth, output_dir, quality=DEFAULT_QUALITY):
     """帯域幅ごとのスループット比較グラフを生成（帯域幅ディレクトリ直下に）"""
+    load_plotting()
+    stats = cube['cells']
     bandwidth_name = bandwidth if bandwidth != '0' else '無制限'
     if bandwidth == '0':
         bandwidth_name = '無制限'
@@ -1121,13 +2164,13 @@ def plot_bandwidth_throughput_comparison(df, bandwidth, output_dir):
         bandwidth_name = '3Mbps'
     
     # 文字列に統一されたbandwidthでフィルタリング
-    bw_data = df[df['Bandwidth'].astype(str) == bandwidth]
+    bw_stats = stats[stats['Bandwidth'] == bandwidth]
     
     # スループットの比較グラフを生成
     fig, ax = plt.subplots(1, 1, figsize=(12, 8))
     fig.patch.set_facecolor(COLORS['background'])
     
-    delay_data = bw_data.groupby(['Protocol', 'NetworkDelay(ms)'])['Throughput(KB/s)'].mean().reset_index()
+    delay_data = condition_table(bw_stats, 'mean')
     
     # データを整理
     y_data_dict = {}
@@ -1142,7 +2185,7 @@ def plot_bandwidth_throughput_comparison(df, bandwidth, output_dir):
     
     if x_data is not None and len(y_data_dict) > 0:
         # 標準偏差を計算
-        delay_std = bw_data.groupby(['Protocol', 'NetworkDelay(ms)'])['Throughput(KB/s)'].std().reset_index()
+        delay_std = condition_table(bw_stats, 'std')
         y_std_dict = {}
         for protocol in ['HTTP/2.0', 'HTTP/3.0']:
             protocol_std = delay_std[delay_std['Protocol'] == protocol].sort_values('NetworkDelay(ms)')
@@ -1152,16 +2195,15 @@ def plot_bandwidth_throughput_comparison(df, bandwidth, output_dir):
         plot_single_graph(ax, x_data, y_data_dict, 
                          'ネットワーク遅延 (ms)', '平均スループット (KB/s)', 
                          f'スループット比較 - {bandwidth_name}',
-                         COLORS, show_labels=True, fill_area=False, label_unit='KB/s', y_std_dict=y_std_dict if y_std_dict else None)
+                         COLORS, show_labels=True, fill_area=False, label_unit='KB/s', y_std_dict=y_std_dict if y_std_dict else None,
+                         dpi=RENDER_PROFILES[quality]['dpi'])
     
     plt.tight_layout()
-    output_file = os.path.join(output_dir, 'throughput_comparison.png')
-    plt.savefig(output_file, dpi=300, 
-                bbox_inches='tight', facecolor='white', pad_inches=0.2)
+    output_file = save_figure(output_dir, 'throughput_comparison', quality)
     print(f"Saved: {output_file}")
     plt.close()
 
-def generate_bandwidth_crossover_report(df, bandwidth, output_dir):
+def generate_bandwidth_crossover_report(cube, bandwidth, output_dir):
     """帯域幅ごとの性能逆転地点レポートを生成（crossover_points_report.txt）"""
     bandwidth_name = bandwidth if bandwidth != '0' else '無制限'
     if bandwidth == '0':
@@ -1173,8 +2215,6 @@ def generate_bandwidth_crossover_report(df, bandwidth, output_dir):
     elif bandwidth == '3mbit':
         bandwidth_name = '3Mbps'
     
-    # 文字列に統一されたbandwidthでフィルタリング
-    bw_data = df[df['Bandwidth'].astype(str) == bandwidth]
     
     report_path = os.path.join(output_dir, 'crossover_points_report.txt')
     
@@ -1187,7 +2227,7 @@ def generate_bandwidth_crossover_report(df, bandwidth, output_dir):
         # TTFBの逆転地点
         f.write("TTFB (Time To First Byte) 逆転地点:\n")
         f.write("-" * 80 + "\n")
-        ttfb_crossovers = find_crossover_points(bw_data, 'TTFB(ms)')
+        ttfb_crossovers = cube_crossover_points(cube, 'TTFB(ms)', bandwidth)
         if ttfb_crossovers:
             for i, cp in enumerate(ttfb_crossovers, 1):
                 f.write(f"\n逆転地点 #{i}:\n")
@@ -1198,13 +2238,22 @@ def generate_bandwidth_crossover_report(df, bandwidth, output_dir):
                 f.write(f"  差: {abs(cp['http2_value'] - cp['http3_value']):.3f} ms\n")
                 diff_pct = abs(cp['http2_value'] - cp['http3_value']) / min(cp['http2_value'], cp['http3_value']) * 100
                 f.write(f"  差（%）: {diff_pct:.2f}%\n")
+                if cp.get('delay_ci'):
+                    f.write(f"  {BOOTSTRAP_CONFIDENCE:.0%}信頼区間: {cp['delay_ci'][0]:.2f} - {cp['delay_ci'][1]:.2f} ms\n")
+                    if cp.get('delay_ci_widened'):
+                        f.write("  ※ ブートストラップの区間が推定遅延を含まなかったため、推定遅延まで広げています\n")
+                if 'support' in cp:
+                    f.write(f"  逆転が再現された割合: {cp['support']:.1%}\n")
         else:
             f.write("\n逆転地点は見つかりませんでした\n")
+        probability = cube_crossover_probability(cube, 'TTFB(ms)', bandwidth)
+        if probability is not None:
+            f.write(f"\n逆転地点が存在する確率: {probability:.1%}（ブートストラップ {BOOTSTRAP_RESAMPLES}回）\n")
         
         f.write("\n\n" + "=" * 80 + "\n")
         f.write("Total Time (Response Time) 逆転地点:\n")
         f.write("-" * 80 + "\n")
-        total_crossovers = find_crossover_points(bw_data, 'TotalTime(ms)')
+        total_crossovers = cube_crossover_points(cube, 'TotalTime(ms)', bandwidth)
         if total_crossovers:
             for i, cp in enumerate(total_crossovers, 1):
                 f.write(f"\n逆転地点 #{i}:\n")
@@ -1215,38 +2264,71 @@ def generate_bandwidth_crossover_report(df, bandwidth, output_dir):
                 f.write(f"  差: {abs(cp['http2_value'] - cp['http3_value']):.3f} ms\n")
                 diff_pct = abs(cp['http2_value'] - cp['http3_value']) / min(cp['http2_value'], cp['http3_value']) * 100
                 f.write(f"  差（%）: {diff_pct:.2f}%\n")
+                if cp.get('delay_ci'):
+                    f.write(f"  {BOOTSTRAP_CONFIDENCE:.0%}信頼区間: {cp['delay_ci'][0]:.2f} - {cp['delay_ci'][1]:.2f} ms\n")
+                    if cp.get('delay_ci_widened'):
+                        f.write("  ※ ブートストラップの区間が推定遅延を含まなかったため、推定遅延まで広げています\n")
+                if 'support' in cp:
+                    f.write(f"  逆転が再現された割合: {cp['support']:.1%}\n")
         else:
             f.write("\n逆転地点は見つかりませんでした\n")
+        probability = cube_crossover_probability(cube, 'TotalTime(ms)', bandwidth)
+        if probability is not None:
+            f.write(f"\n逆転地点が存在する確率: {probability:.1%}（ブートストラップ {BOOTSTRAP_RESAMPLES}回）\n")
+        
+        # テール（p99）同士で比較した逆転地点
+        for metric, metric_label in (('TTFB(ms)', 'TTFB'), ('TotalTime(ms)', 'Total Time')):
+            f.write("\n\n" + "=" * 80 + "\n")
+            f.write(f"{metric_label} {TAIL_CROSSOVER_STAT} 逆転地点:\n")
+            f.write("-" * 80 + "\n")
+            tail_crossovers = cube_crossover_points(cube, metric, bandwidth, tail=True)
+            if tail_crossovers:
+                for i, cp in enumerate(tail_crossovers, 1):
+                    f.write(f"\n逆転地点 #{i}:\n")
+                    f.write(f"  方向: {cp['direction']}\n")
+                    f.write(f"  推定遅延: {cp['delay']:.2f} ms\n")
+                    f.write(f"  HTTP/2 {TAIL_CROSSOVER_STAT}: {cp['http2_value']:.3f} ms\n")
+                    f.write(f"  HTTP/3 {TAIL_CROSSOVER_STAT}: {cp['http3_value']:.3f} ms\n")
+            else:
+                f.write("\n逆転地点は見つかりませんでした\n")
     
     print(f"Saved: {report_path}")
 
-def plot_crossover_points_by_bandwidth(df, output_dir):
+def plot_crossover_points_by_bandwidth(cube, output_dir, quality=DEFAULT_QUALITY):
     """帯域幅ごとの逆転地点をまとめたグラフを生成（縦軸: 逆転地点の遅延値、横軸: 帯域幅）"""
+    load_plotting()
     # 帯域幅の順序を定義
     bandwidth_order = ['0', '1mbit', '2mbit', '3mbit']
     bandwidth_names = ['無制限', '1Mbps', '2Mbps', '3Mbps']
     
     # データを収集
-    ttfb_data = {}  # {bandwidth: [delay_values]}
-    total_time_data = {}  # {bandwidth: [delay_values]}
+    ttfb_data = {}  # {bandwidth: [(delay_value, delay_ci), ...]}
+    total_time_data = {}  # {bandwidth: [(delay_value, delay_ci), ...]}
     
     for bw, bw_name in zip(bandwidth_order, bandwidth_names):
-        bw_data = df[df['Bandwidth'].astype(str) == bw]
         
         # TTFBの逆転地点
-        ttfb_crossovers = find_crossover_points(bw_data, 'TTFB(ms)')
+        ttfb_crossovers = cube_crossover_points(cube, 'TTFB(ms)', bw)
         if ttfb_crossovers:
-            ttfb_data[bw_name] = [cp['delay'] for cp in ttfb_crossovers]
+            ttfb_data[bw_name] = [(cp['delay'], cp.get('delay_ci')) for cp in ttfb_crossovers]
         else:
             ttfb_data[bw_name] = []
         
         # Total Timeの逆転地点
-        total_crossovers = find_crossover_points(bw_data, 'TotalTime(ms)')
+        total_crossovers = cube_crossover_points(cube, 'TotalTime(ms)', bw)
         if total_crossovers:
-            total_time_data[bw_name] = [cp['delay'] for cp in total_crossovers]
+            total_time_data[bw_name] = [(cp['delay'], cp.get('delay_ci')) for cp in total_crossovers]
         else:
             total_time_data[bw_name] = []
     
+    def tick_labels(metric):
+        # 帯域幅名の下に逆転地点の存在確率（ブートストラップ）を表示
+        labels = []
+        for bw, bw_name in zip(bandwidth_order, bandwidth_names):
+            probability = cube_crossover_probability(cube, metric, bw)
+            labels.append(f'{bw_name}\n(存在確率 {probability:.0%})' if probability is not None else bw_name)
+        return labels
+    
     # グラフを生成
     fig, axes = plt.subplots(2, 1, figsize=(14, 12))
     fig.patch.set_facecolor(COLORS['background'])
@@ -1261,7 +2343,8 @@ def plot_crossover_points_by_bandwidth(df, output_dir):
     
     for i, bw_name in enumerate(bandwidth_names):
         if bw_name in ttfb_data and ttfb_data[bw_name]:
-            delays = sorted(ttfb_data[bw_name])
+            points = sorted(ttfb_data[bw_name], key=lambda point: point[0])
+            delays = [delay for delay, _ in points]
             all_ttfb_delays.extend(delays)
             
             # 複数の逆転地点がある場合はx位置を少しずらす
@@ -1273,8 +2356,13 @@ def plot_crossover_points_by_bandwidth(df, output_dir):
             else:
                 x_offsets = [0]
             
-            for j, (delay, x_offset) in enumerate(zip(delays, x_offsets)):
+            for j, ((delay, delay_ci), x_offset) in enumerate(zip(points, x_offsets)):
                 x_pos = i + x_offset
+                # ブートストラップによる信頼区間をエラーバーで表示
+                if delay_ci:
+                    ax1.errorbar(x_pos, delay, yerr=[[max(0, delay - delay_ci[0])], [max(0, delay_ci[1] - delay)]], fmt='none',
+                                 ecolor=COLORS['http2']['main'], elinewidth=2.5, capsize=10, capthick=2.5, zorder=4, alpha=0.8)
+                    all_ttfb_delays.extend(delay_ci)
                 ax1.scatter(x_pos, delay, s=300, c=COLORS['http2']['main'], marker='o', 
                            edgecolors='white', linewidths=2.5, zorder=5, alpha=0.8)
                 # 値のラベルを追加（位置を調整）
@@ -1286,7 +2374,7 @@ def plot_crossover_points_by_bandwidth(df, output_dir):
                                    edgecolor=COLORS['http2']['main'], alpha=0.8))
     
     ax1.set_xticks(x_positions)
-    ax1.set_xticklabels(bandwidth_names, fontsize=14, fontweight='bold', color=COLORS['axis'])
+    ax1.set_xticklabels(tick_labels('TTFB(ms)'), fontsize=14, fontweight='bold', color=COLORS['axis'])
     ax1.set_ylabel('逆転地点の遅延値 (ms)', fontsize=16, fontweight='bold', color=COLORS['axis'])
     ax1.set_xlabel('帯域幅', fontsize=16, fontweight='bold', color=COLORS['axis'])
     ax1.set_title('TTFB 性能逆転地点 - 帯域幅別', fontsize=20, fontweight='bold', color=COLORS['text'], pad=20)
@@ -1308,7 +2396,8 @@ def plot_crossover_points_by_bandwidth(df, output_dir):
     
     for i, bw_name in enumerate(bandwidth_names):
         if bw_name in total_time_data and total_time_data[bw_name]:
-            delays = sorted(total_time_data[bw_name])
+            points = sorted(total_time_data[bw_name], key=lambda point: point[0])
+            delays = [delay for delay, _ in points]
             all_total_delays.extend(delays)
             
             # 複数の逆転地点がある場合はx位置を少しずらす
@@ -1320,8 +2409,13 @@ def plot_crossover_points_by_bandwidth(df, output_dir):
             else:
                 x_offsets = [0]
             
-            for j, (delay, x_offset) in enumerate(zip(delays, x_offsets)):
+            for j, ((delay, delay_ci), x_offset) in enumerate(zip(points, x_offsets)):
                 x_pos = i + x_offset
+                # ブートストラップによる信頼区間をエラーバーで表示
+                if delay_ci:
+                    ax2.errorbar(x_pos, delay, yerr=[[max(0, delay - delay_ci[0])], [max(0, delay_ci[1] - delay)]], fmt='none',
+                                 ecolor=COLORS['http3']['main'], elinewidth=2.5, capsize=10, capthick=2.5, zorder=4, alpha=0.8)
+                    all_total_delays.extend(delay_ci)
                 ax2.scatter(x_pos, delay, s=300, c=COLORS['http3']['main'], marker='s', 
                            edgecolors='white', linewidths=2.5, zorder=5, alpha=0.8)
                 # 値のラベルを追加（位置を調整）
@@ -1333,7 +2427,7 @@ def plot_crossover_points_by_bandwidth(df, output_dir):
                                    edgecolor=COLORS['http3']['main'], alpha=0.8))
     
     ax2.set_xticks(x_positions)
-    ax2.set_xticklabels(bandwidth_names, fontsize=14, fontweight='bold', color=COLORS['axis'])
+    ax2.set_xticklabels(tick_labels('TotalTime(ms)'), fontsize=14, fontweight='bold', color=COLORS['axis'])
     ax2.set_ylabel('逆転地点の遅延値 (ms)', fontsize=16, fontweight='bold', color=COLORS['axis'])
     ax2.set_xlabel('帯域幅', fontsize=16, fontweight='bold', color=COLORS['axis'])
     ax2.set_title('Total Time 性能逆転地点 - 帯域幅別', fontsize=20, fontweight='bold', color=COLORS['text'], pad=20)
@@ -1350,14 +2444,13 @@ def plot_crossover_points_by_bandwidth(df, output_dir):
         ax2.set_ylim(bottom=0)
     
     plt.tight_layout()
-    output_file = os.path.join(output_dir, 'crossover_points_by_bandwidth.png')
-    plt.savefig(output_file, dpi=300, 
-                bbox_inches='tight', facecolor='white', pad_inches=0.2)
+    output_file = save_figure(output_dir, 'crossover_points_by_bandwidth', quality)
     print(f"Saved: {output_file}")
     plt.close()
 
-def generate_crossover_analysis_report(df, output_dir):
+def generate_crossover_analysis_report(cube, output_dir):
     """逆転地点分析レポートを生成（crossover_analysis_report.txt）"""
+    stats = cube['cells']
     report_path = os.path.join(output_dir, 'crossover_analysis_report.txt')
     
     with open(report_path, 'w', encoding='utf-8') as f:
@@ -1368,7 +2461,7 @@ def generate_crossover_analysis_report(df, output_dir):
         
     # 帯域幅ごとの逆転地点サマリー
     # Bandwidthを文字列に統一してからソート
-    unique_bandwidths = [str(bw) for bw in df['Bandwidth'].unique()]
+    unique_bandwidths = [str(bw) for bw in stats['Bandwidth'].unique()]
     unique_bandwidths = sorted(set(unique_bandwidths))
     for bandwidth in unique_bandwidths:
             bandwidth_name = bandwidth if bandwidth != '0' else '無制限'
@@ -1379,14 +2472,12 @@ def generate_crossover_analysis_report(df, output_dir):
             elif bandwidth == '3mbit':
                 bandwidth_name = '3Mbps'
             
-            # 文字列に統一されたbandwidthでフィルタリング
-            bw_data = df[df['Bandwidth'].astype(str) == bandwidth]
             f.write(f"\n{'=' * 80}\n")
             f.write(f"帯域幅: {bandwidth_name}\n")
             f.write(f"{'=' * 80}\n")
             
             # TTFBの逆転地点
-            ttfb_crossovers = find_crossover_points(bw_data, 'TTFB(ms)')
+            ttfb_crossovers = cube_crossover_points(cube, 'TTFB(ms)', bandwidth)
             if ttfb_crossovers:
                 f.write("\nTTFB (Time To First Byte) 逆転地点:\n")
                 f.write("-" * 80 + "\n")
@@ -1400,7 +2491,7 @@ def generate_crossover_analysis_report(df, output_dir):
                 f.write("\nTTFB: 逆転地点は見つかりませんでした\n")
             
             # Total Timeの逆転地点
-            total_crossovers = find_crossover_points(bw_data, 'TotalTime(ms)')
+            total_crossovers = cube_crossover_points(cube, 'TotalTime(ms)', bandwidth)
             if total_crossovers:
                 f.write("\nTotal Time (Response Time) 逆転地点:\n")
                 f.write("-" * 80 + "\n")
@@ -1415,12 +2506,14 @@ def generate_crossover_analysis_report(df, output_dir):
     
     print(f"Saved: {report_path}")
 
-def plot_crossover_points_summary(df, output_dir):
+def plot_crossover_points_summary(cube, output_dir, quality=DEFAULT_QUALITY):
     """逆転地点サマリー画像を生成（crossover_points_summary.png）"""
+    load_plotting()
+    stats = cube['cells']
     fig, axes = plt.subplots(2, 1, figsize=(14, 12))
     fig.patch.set_facecolor(COLORS['background'])
     
-    bandwidths = sorted(df['Bandwidth'].unique())
+    bandwidths = sorted(stats['Bandwidth'].unique())
     bandwidth_names = []
     for bw in bandwidths:
         if bw == '0':
@@ -1442,8 +2535,7 @@ def plot_crossover_points_summary(df, output_dir):
     ttfb_crossover_delays = []
     ttfb_labels = []
     for i, bandwidth in enumerate(bandwidths):
-        bw_data = df[df['Bandwidth'] == bandwidth]
-        crossovers = find_crossover_points(bw_data, 'TTFB(ms)')
+        crossovers = cube_crossover_points(cube, 'TTFB(ms)', bandwidth)
         for cp in crossovers:
             ttfb_crossover_delays.append(cp['delay'])
             ttfb_labels.append(f"{bandwidth_names[i]}\n{cp['delay']:.1f}ms")
@@ -1465,8 +2557,7 @@ def plot_crossover_points_summary(df, output_dir):
     total_crossover_delays = []
     total_labels = []
     for i, bandwidth in enumerate(bandwidths):
-        bw_data = df[df['Bandwidth'] == bandwidth]
-        crossovers = find_crossover_points(bw_data, 'TotalTime(ms)')
+        crossovers = cube_crossover_points(cube, 'TotalTime(ms)', bandwidth)
         for cp in crossovers:
             total_crossover_delays.append(cp['delay'])
             total_labels.append(f"{bandwidth_names[i]}\n{cp['delay']:.1f}ms")
@@ -1482,15 +2573,19 @@ def plot_crossover_points_summary(df, output_dir):
         ax2.set_title('Total Time逆転地点', fontsize=20, fontweight='bold', color=COLORS['text'], pad=20)
     
     plt.tight_layout()
-    output_file = os.path.join(output_dir, 'crossover_points_summary.png')
-    plt.savefig(output_file, dpi=300, 
-                bbox_inches='tight', facecolor='white', pad_inches=0.2)
+    output_file = save_figure(output_dir, 'crossover_points_summary', quality)
     print(f"Saved: {output_file}")
     plt.close()
 
-def generate_summary_report(df, output_dir):
+def format_percentiles(row, metric):
+    """統計表の1行から分位点を「p50/p90/p99/p99.9」の順に並べた文字列にする"""
+    return ' / '.join(f"{row[(metric, quantile_column(q))]:.3f}" for q in SKETCH_QUANTILES)
+
+def generate_summary_report(cube, output_dir):
     """総合レポートを生成（total_report.txt）"""
+    stats = cube['cells']
     report_path = os.path.join(output_dir, 'total_report.txt')
+    percentile_names = '/'.join(quantile_column(q) for q in SKETCH_QUANTILES)
     
     with open(report_path, 'w', encoding='utf-8') as f:
         f.write("=" * 80 + "\n")
@@ -1501,14 +2596,16 @@ def generate_summary_report(df, output_dir):
         f.write("Overall Statistics:\n")
         f.write("-" * 80 + "\n")
         for protocol in ['HTTP/2.0', 'HTTP/3.0']:
-            protocol_data = df[df['Protocol'] == protocol]
-            if len(protocol_data) > 0:
+            row = cube_row(cube['protocol'], Protocol=protocol)
+            if row is not None:
                 f.write(f"\n{protocol}:\n")
-                f.write(f"  Total Requests: {len(protocol_data)}\n")
-                f.write(f"  TTFB (avg): {protocol_data['TTFB(ms)'].mean():.3f} ms\n")
-                f.write(f"  TTFB (std): {protocol_data['TTFB(ms)'].std():.3f} ms\n")
-                f.write(f"  Total Time (avg): {protocol_data['TotalTime(ms)'].mean():.3f} ms\n")
-                f.write(f"  Throughput (avg): {protocol_data['Throughput(KB/s)'].mean():.2f} KB/s\n")
+                f.write(f"  Total Requests: {row[('TTFB(ms)', 'count')]}\n")
+                f.write(f"  TTFB (avg): {row[('TTFB(ms)', 'mean')]:.3f} ms\n")
+                f.write(f"  TTFB (std): {row[('TTFB(ms)', 'std')]:.3f} ms\n")
+                f.write(f"  TTFB ({percentile_names}): {format_percentiles(row, 'TTFB(ms)')} ms\n")
+                f.write(f"  Total Time (avg): {row[('TotalTime(ms)', 'mean')]:.3f} ms\n")
+                f.write(f"  Total Time ({percentile_names}): {format_percentiles(row, 'TotalTime(ms)')} ms\n")
+                f.write(f"  Throughput (avg): {row[('Throughput(KB/s)', 'mean')]:.2f} KB/s\n")
         
         # 帯域幅ごとの逆転地点サマリー
         f.write("\n\n" + "=" * 80 + "\n")
@@ -1516,7 +2613,7 @@ def generate_summary_report(df, output_dir):
         f.write("=" * 80 + "\n")
         
         # Bandwidthを文字列に統一してからソート
-        unique_bandwidths = [str(bw) for bw in df['Bandwidth'].unique()]
+        unique_bandwidths = [str(bw) for bw in stats['Bandwidth'].unique()]
         unique_bandwidths = sorted(set(unique_bandwidths))
         for bandwidth in unique_bandwidths:
             bandwidth_name = bandwidth if bandwidth != '0' else '無制限'
@@ -1527,13 +2624,11 @@ def generate_summary_report(df, output_dir):
             elif bandwidth == '3mbit':
                 bandwidth_name = '3Mbps'
             
-            # 文字列に統一されたbandwidthでフィルタリング
-            bw_data = df[df['Bandwidth'].astype(str) == bandwidth]
             f.write(f"\n{bandwidth_name}:\n")
             f.write("-" * 80 + "\n")
             
             # TTFBの逆転地点
-            ttfb_crossovers = find_crossover_points(bw_data, 'TTFB(ms)')
+            ttfb_crossovers = cube_crossover_points(cube, 'TTFB(ms)', bandwidth)
             if ttfb_crossovers:
                 f.write("  TTFB:\n")
                 for cp in ttfb_crossovers:
@@ -1542,37 +2637,935 @@ def generate_summary_report(df, output_dir):
                 f.write("  TTFB: 逆転地点なし\n")
             
             # Total Timeの逆転地点
-            total_crossovers = find_crossover_points(bw_data, 'TotalTime(ms)')
+            total_crossovers = cube_crossover_points(cube, 'TotalTime(ms)', bandwidth)
             if total_crossovers:
                 f.write("  Total Time:\n")
                 for cp in total_crossovers:
                     f.write(f"    {cp['direction']} @ {cp['delay']:.1f}ms\n")
             else:
                 f.write("  Total Time: 逆転地点なし\n")
+            
+            # テール（p99）同士の逆転地点
+            for metric, metric_label in (('TTFB(ms)', 'TTFB'), ('TotalTime(ms)', 'Total Time')):
+                tail_crossovers = cube_crossover_points(cube, metric, bandwidth, tail=True)
+                if tail_crossovers:
+                    f.write(f"  {metric_label} ({TAIL_CROSSOVER_STAT}):\n")
+                    for cp in tail_crossovers:
+                        f.write(f"    {cp['direction']} @ {cp['delay']:.1f}ms\n")
+                else:
+                    f.write(f"  {metric_label} ({TAIL_CROSSOVER_STAT}): 逆転地点なし\n")
         
         # 条件別統計
         f.write("\n\n" + "=" * 80 + "\n")
         f.write("Performance by Network Conditions:\n")
         f.write("=" * 80 + "\n")
         
-        stats = analyze_by_condition(df)
         for _, row in stats.iterrows():
             f.write(f"\nProtocol: {row['Protocol']}, ")
             f.write(f"Delay: {row['NetworkDelay(ms)']}ms, ")
             f.write(f"Bandwidth: {row['Bandwidth']}\n")
             f.write(f"  TTFB: {row[('TTFB(ms)', 'mean')]:.3f} ± {row[('TTFB(ms)', 'std')]:.3f} ms\n")
+            f.write(f"  TTFB ({percentile_names}): {format_percentiles(row, 'TTFB(ms)')} ms\n")
             f.write(f"  Total Time: {row[('TotalTime(ms)', 'mean')]:.3f} ± {row[('TotalTime(ms)', 'std')]:.3f} ms\n")
+            f.write(f"  Total Time ({percentile_names}): {format_percentiles(row, 'TotalTime(ms)')} ms\n")
             f.write(f"  Throughput: {row[('Throughput(KB/s)', 'mean')]:.2f} ± {row[('Throughput(KB/s)', 'std')]:.2f} KB/s\n")
     
     print(f"Saved: {report_path}")
 
+def bandwidth_display_name(bandwidth):
+    """Bandwidth値から帯域幅ディレクトリ名を求める"""
+    bandwidth_name = bandwidth if bandwidth != '0' else '無制限'
+    if bandwidth == '1mbit':
+        bandwidth_name = '1Mbps'
+    elif bandwidth == '2mbit':
+        bandwidth_name = '2Mbps'
+    elif bandwidth == '3mbit':
+        bandwidth_name = '3Mbps'
+    return bandwidth_name
+
+def prepare_bandwidth_dir(bw_dir):
+    """帯域幅ディレクトリを作成する（存在しない場合）"""
+    os.makedirs(bw_dir, exist_ok=True)
+
+ANALYSIS_MANIFEST_FILE = 'analysis_manifest.json'
+ANALYSIS_MANIFEST_VERSION = 1
+
+def frame_fingerprint(frame):
+    """集計テーブルの内容（列名と値）から計算するハッシュ"""
+    digest = hashlib.sha256(repr(list(frame.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def generator_fingerprint():
+    """出力内容を決めるこのスクリプト自体のハッシュ"""
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+def build_analysis_tasks(cube, results_dir, output_dir, reports_only=False, quality=DEFAULT_QUALITY):
+    """グラフ・レポート生成をタスクとして列挙する（name, kind, func, args, deps, outputs, fingerprint）"""
+    tasks = []
+    generator = generator_fingerprint()
+    
+    def add_task(name, func, *args, deps=(), outputs=(), data=None, variant='', kind='reports'):
+        # 出力ファイルは参照する集計データ・スクリプト・描画品質が同じであれば再生成しない
+        fingerprint = None
+        if data is not None:
+            fingerprint = hashlib.sha256(f"{generator}:{variant}:{frame_fingerprint(data)}".encode('utf-8')).hexdigest()
+        tasks.append({'name': name, 'kind': kind, 'func': func, 'args': args, 'deps': list(deps),
+                      'outputs': list(outputs), 'fingerprint': fingerprint})
+    
+    def add_figure_task(name, func, *args, output_dir, figure, deps=(), data=None):
+        add_task(name, func, *args, output_dir, quality, deps=deps, data=data, variant=quality, kind='graphs',
+                 outputs=[os.path.join(output_dir, figure_filename(figure, quality))])
+    
+    # 全体のグラフを生成（セッションディレクトリのanalysisフォルダに）
+    stats = cube['cells']
+    if not reports_only:
+        add_figure_task('TTFB comparison', plot_ttfb_comparison, cube,
+                        output_dir=output_dir, figure='ttfb_comparison', data=stats)
+        add_figure_task('throughput comparison', plot_throughput_comparison, cube,
+                        output_dir=output_dir, figure='throughput_comparison', data=stats)
+        add_figure_task('Total Time comparison', plot_total_time_comparison, cube,
+                        output_dir=output_dir, figure='total_time_comparison', data=stats)
+    
+    # 帯域幅ごとのレポート、グラフを生成（各帯域幅ディレクトリ直下に）
+    # Bandwidthを文字列に統一してからソート
+    unique_bandwidths = [str(bw) for bw in stats['Bandwidth'].unique()]
+    unique_bandwidths = sorted(set(unique_bandwidths))
+    for bandwidth in unique_bandwidths:
+        bandwidth_name = bandwidth_display_name(bandwidth)
+        bw_dir = os.path.join(results_dir, bandwidth_name)
+        # 帯域幅ごとの出力はその帯域幅の条件だけに依存する
+        bw_stats = stats[stats['Bandwidth'] == bandwidth]
+        dir_task = f'{bandwidth_name} directory'
+        add_task(dir_task, prepare_bandwidth_dir, bw_dir, kind='setup')
+        add_task(f'summary report for {bandwidth_name}', generate_bandwidth_report, cube, bandwidth, bw_dir, deps=[dir_task],
+                 outputs=[os.path.join(bw_dir, 'summary_report.txt')], data=bw_stats)
+        if not reports_only:
+            add_figure_task(f'TTFB comparison for {bandwidth_name}', plot_bandwidth_ttfb_comparison, cube, bandwidth,
+                            output_dir=bw_dir, figure='ttfb_comparison', deps=[dir_task], data=bw_stats)
+            add_figure_task(f'response time comparison for {bandwidth_name}', plot_bandwidth_response_time_comparison, cube, bandwidth,
+                            output_dir=bw_dir, figure='response_time_comparison', deps=[dir_task], data=bw_stats)
+            add_figure_task(f'throughput comparison for {bandwidth_name}', plot_bandwidth_throughput_comparison, cube, bandwidth,
+                            output_dir=bw_dir, figure='throughput_comparison', deps=[dir_task], data=bw_stats)
+        add_task(f'crossover points report for {bandwidth_name}', generate_bandwidth_crossover_report, cube, bandwidth, bw_dir, deps=[dir_task],
+                 outputs=[os.path.join(bw_dir, 'crossover_points_report.txt')], data=bw_stats)
+    
+    # 総合レポート（total_report.txt）と帯域幅別の逆転地点グラフ（sessionディレクトリ直下に）
+    add_task('total report', generate_summary_report, cube, results_dir,
+             outputs=[os.path.join(results_dir, 'total_report.txt')], data=stats)
+    if not reports_only:
+        add_figure_task('crossover points by bandwidth graph', plot_crossover_points_by_bandwidth, cube,
+                        output_dir=results_dir, figure='crossover_points_by_bandwidth', data=stats)
+    
+    return tasks
+
+def load_analysis_manifest(results_dir):
+    """前回の実行で生成した出力ファイルと、その入力のハッシュを読み込む"""
+    manifest_path = os.path.join(results_dir, ANALYSIS_MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != ANALYSIS_MANIFEST_VERSION:
+            return {}
+        return manifest.get('outputs', {})
+    except Exception as e:
+        print(f"Warning: Failed to read {manifest_path}: {e}")
+        return {}
+
+def save_analysis_manifest(results_dir, outputs):
+    """出力ファイルごとの入力ハッシュを保存する（書き込み途中で中断されても壊れないよう置き換える）"""
+    manifest_path = os.path.join(results_dir, ANALYSIS_MANIFEST_FILE)
+    try:
+        tmp_path = manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': ANALYSIS_MANIFEST_VERSION, 'outputs': outputs}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+    except Exception as e:
+        print(f"Warning: Failed to write {manifest_path}: {e}")
+
+def find_unchanged_tasks(tasks, manifest, results_dir):
+    """全ての出力ファイルが存在し、入力のハッシュが前回と同じタスクを求める"""
+    unchanged = {}
+    for task in tasks:
+        if not task['outputs'] or task['fingerprint'] is None:
+            continue
+        if all(os.path.exists(path) and manifest.get(os.path.relpath(path, results_dir)) == task['fingerprint']
+               for path in task['outputs']):
+            print(f"Skipping {task['name']} (inputs unchanged)")
+            unchanged[task['name']] = {'status': 'unchanged', 'seconds': 0.0}
+    return unchanged
+
+def update_analysis_manifest(tasks, results, manifest, results_dir):
+    """今回生成した（または変更がなかった）出力ファイルをマニフェストに記録する"""
+    # 今回のタスクに含まれない出力（--reports-only 時のグラフなど）は残っていれば前回の記録を引き継ぐ
+    task_outputs = {os.path.relpath(path, results_dir) for task in tasks for path in task['outputs']}
+    outputs = {rel_path: fingerprint for rel_path, fingerprint in manifest.items()
+               if rel_path not in task_outputs and os.path.exists(os.path.join(results_dir, rel_path))}
+    for task in tasks:
+        status = results.get(task['name'], {}).get('status')
+        for path in task['outputs']:
+            rel_path = os.path.relpath(path, results_dir)
+            if status == 'ok' and task['fingerprint'] is not None:
+                outputs[rel_path] = task['fingerprint']
+            elif status == 'unchanged':
+                outputs[rel_path] = manifest[rel_path]
+    save_analysis_manifest(results_dir, outputs)
+
+# --profile の出力（セッションディレクトリ直下）
+ANALYSIS_PROFILE_FILE = 'analysis_profile.json'
+ANALYSIS_PROFILE_VERSION = 1
+
+# --profile 実行中のタスク内の区間ごとの所要時間 {区間名: 秒}（計測しない場合はNone）
+PROFILE_SECTIONS = None
+
+def add_profile_section(name, start):
+    """--profile 実行中であれば、startからの経過時間を区間ごとに積算する"""
+    if PROFILE_SECTIONS is not None:
+        PROFILE_SECTIONS[name] = PROFILE_SECTIONS.get(name, 0.0) + time.perf_counter() - start
+
+def peak_rss_mb():
+    """このプロセスの最大常駐メモリ（MB、resourceモジュールがない環境ではNone）"""
+    if importlib.util.find_spec('resource') is None:
+        return None
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linuxは KB、macOSは バイト単位
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def profile_call(func, args=(), kwargs=None, trace_memory=False):
+    """関数を実行し、戻り値と計測結果（経過時間・CPU時間・最大RSSとその増分・区間の内訳、trace_memory=Trueの場合はtracemallocのピーク）を返す"""
+    global PROFILE_SECTIONS
+    if trace_memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    PROFILE_SECTIONS = {}
+    rss_start = peak_rss_mb()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        result = func(*args, **(kwargs or {}))
+        rss = peak_rss_mb()
+        measured = {
+            'function': getattr(func, '__name__', str(func)),
+            'wall_seconds': time.perf_counter() - wall_start,
+            'cpu_seconds': time.process_time() - cpu_start,
+            'peak_rss_mb': rss,
+            # 最大RSSはプロセス全体の最大値なので、この段階で増えた分を別に記録する
+            'peak_rss_growth_mb': rss - rss_start if rss is not None else None,
+        }
+        if trace_memory:
+            measured['tracemalloc_peak_mb'] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        if PROFILE_SECTIONS:
+            measured['sections'] = PROFILE_SECTIONS
+    finally:
+        PROFILE_SECTIONS = None
+    return result, measured
+
+def run_stage(profile, name, func, *args, **kwargs):
+    """解析の段階を実行する（profileが指定された場合は profile['stages'] に計測結果を追加する）"""
+    if profile is None:
+        return func(*args, **kwargs)
+    result, measured = profile_call(func, args, kwargs, trace_memory=profile['trace_memory'])
+    profile['stages'].append({'stage': name, 'status': 'ok', **measured})
+    return result
+
+def task_profile(tasks, results):
+    """タスクの実行結果から計測結果を取り出す（実行しなかったタスクは状態のみ）"""
+    entries = []
+    for task in tasks:
+        result = results.get(task['name'], {'status': 'skipped'})
+        entries.append({'stage': task['name'], 'status': result['status'], **result.get('profile', {})})
+    return entries
+
+def write_analysis_profile(results_dir, profile, options, records, started):
+    """段階ごとの計測結果を analysis_profile.json に書き出す（解析コストの推移を追えるよう実行環境も記録する）"""
+    json_path = os.path.join(results_dir, ANALYSIS_PROFILE_FILE)
+    report = {
+        'version': ANALYSIS_PROFILE_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'records': int(records),
+        'options': options,
+        'environment': {'python': sys.version.split()[0], 'pandas': pd.__version__, 'numpy': np.__version__,
+                        'cpu_count': os.cpu_count()},
+        'total': {'wall_seconds': time.perf_counter() - started[0], 'cpu_seconds': time.process_time() - started[1],
+                  'peak_rss_mb': peak_rss_mb()},
+        'trace_memory': profile['trace_memory'],
+        'stages': profile['stages'],
+    }
+    try:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Saved: {json_path}")
+    except Exception as e:
+        print(f"Warning: Failed to write {json_path}: {e}")
+    return report
+
+def print_profile_summary(report):
+    """段階ごとの経過時間・CPU時間・メモリを表示する（ワーカープロセスで実行したタスクのRSSはそのプロセスの値）"""
+    def megabytes(value):
+        return f"{value:9.1f}" if value is not None else f"{'-':>9}"
+    
+    print("\nProfile summary:")
+    print("-" * 100)
+    print(f"  {'stage':<50} {'wall(s)':>8} {'cpu(s)':>8} {'RSS(MB)':>9} {'+RSS(MB)':>9} {'alloc(MB)':>9}  sections")
+    sections_total = {}
+    for entry in report['stages']:
+        if 'wall_seconds' not in entry:
+            continue
+        sections = entry.get('sections', {})
+        for name, seconds in sections.items():
+            sections_total[name] = sections_total.get(name, 0.0) + seconds
+        detail = ', '.join(f"{name} {seconds:.2f}s" for name, seconds in sections.items())
+        print(f"  {entry['stage'][:50]:<50} {entry['wall_seconds']:8.2f} {entry['cpu_seconds']:8.2f} "
+              f"{megabytes(entry['peak_rss_mb'])} {megabytes(entry['peak_rss_growth_mb'])} "
+              f"{megabytes(entry.get('tracemalloc_peak_mb'))}  {detail}")
+    print("-" * 100)
+    total = report['total']
+    print(f"  {'total':<50} {total['wall_seconds']:8.2f} {total['cpu_seconds']:8.2f} {megabytes(total['peak_rss_mb'])}")
+    if sections_total:
+        print("  " + ', '.join(f"{name}: {seconds:.2f}s" for name, seconds in sections_total.items()))
+
+def run_task(name, func, args, profile=None):
+    """タスクを1つ実行する（例外はタスク内に閉じ込め、エラー・所要時間・profile指定時は計測結果を返す）"""
+    print(f"Generating {name}...")
+    start = time.perf_counter()
+    measured = None
+    try:
+        if profile is not None:
+            _, measured = profile_call(func, args, trace_memory=profile['trace_memory'])
+        else:
+            func(*args)
+        error = None
+    except Exception:
+        error = traceback.format_exc()
+    return error, time.perf_counter() - start, measured
+
+def run_task_graph(tasks, jobs=1, done=None, profile=None):
+    """依存関係を満たしたタスクから実行する（jobs > 1 の場合はプロセスプールで並列実行、doneのタスクは実行しない）"""
+    results = dict(done or {})
+    pending = [task for task in tasks if task['name'] not in results]
+    running = {}
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    
+    def finish(task, error, seconds, measured=None):
+        results[task['name']] = {'status': 'failed' if error else 'ok', 'seconds': seconds}
+        if measured is not None:
+            results[task['name']]['profile'] = measured
+        if error:
+            print(f"Warning: Failed to generate {task['name']}:\n{error}")
+    
+    try:
+        while pending or running:
+            # 依存タスクが全て完了したものを開始（依存先が失敗していればスキップ）
+            progressed = False
+            for task in list(pending):
+                dep_status = [results.get(dep, {}).get('status') for dep in task['deps']]
+                if any(status in ('failed', 'skipped') for status in dep_status):
+                    pending.remove(task)
+                    progressed = True
+                    results[task['name']] = {'status': 'skipped', 'seconds': 0.0}
+                    print(f"Warning: Skipped {task['name']} (dependency failed)")
+                elif all(status in ('ok', 'unchanged') for status in dep_status):
+                    pending.remove(task)
+                    progressed = True
+                    if executor is None:
+                        finish(task, *run_task(task['name'], task['func'], task['args'], profile))
+                    else:
+                        # ワーカープロセスには計測の設定だけを渡す
+                        running[executor.submit(run_task, task['name'], task['func'], task['args'],
+                                                profile and {'trace_memory': profile['trace_memory']})] = task
+            
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        finish(task, *future.result())
+                    except Exception:
+                        # ワーカープロセス自体が異常終了した場合
+                        finish(task, traceback.format_exc(), 0.0)
+            elif not progressed:
+                # 存在しないタスクへの依存など、実行できないタスクが残った場合
+                for task in pending:
+                    print(f"Warning: Skipped {task['name']} (unresolved dependency)")
+                    results[task['name']] = {'status': 'skipped', 'seconds': 0.0}
+                pending = []
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    return results
+
+def print_task_summary(tasks, results):
+    """タスクごとの所要時間と結果を表示する"""
+    print("\nTask summary:")
+    print("-" * 80)
+    for task in tasks:
+        result = results.get(task['name'], {'status': 'skipped', 'seconds': 0.0})
+        print(f"  {task['name']:<60} {result['status']:<8} {result['seconds']:7.2f}s")
+    total = sum(result['seconds'] for result in results.values())
+    unchanged = sum(1 for result in results.values() if result['status'] == 'unchanged')
+    failed = sum(1 for result in results.values() if result['status'] not in ('ok', 'unchanged'))
+    print("-" * 80)
+    print(f"  {len(tasks)} tasks, {unchanged} unchanged, {failed} failed/skipped, {total:.2f}s task time")
+
+# セッション横断の結果ストア（SQLite）
+RESULTS_STORE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS sessions (
+    session TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    started_at TEXT,
+    ingested_at TEXT NOT NULL,
+    records INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS requests (
+    session TEXT NOT NULL,
+    protocol TEXT,
+    bandwidth TEXT,
+    delay_ms INTEGER,
+    request_time TEXT,
+    ttfb_ms REAL,
+    total_time_ms REAL,
+    bytes_received INTEGER,
+    status_code INTEGER,
+    error TEXT,
+    throughput_kbps REAL
+);
+CREATE INDEX IF NOT EXISTS requests_condition ON requests (session, protocol, bandwidth, delay_ms);
+CREATE TABLE IF NOT EXISTS cube_stats (
+    session TEXT NOT NULL,
+    level TEXT NOT NULL,
+    protocol TEXT,
+    bandwidth TEXT,
+    delay_ms INTEGER,
+    metric TEXT NOT NULL,
+    stat TEXT NOT NULL,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS cube_stats_condition ON cube_stats (session, protocol, bandwidth, delay_ms);
+CREATE INDEX IF NOT EXISTS cube_stats_metric ON cube_stats (metric, stat, level);
+CREATE TABLE IF NOT EXISTS crossovers (
+    session TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    stat TEXT NOT NULL,
+    bandwidth TEXT,
+    delay_ms REAL,
+    direction TEXT,
+    http2_value REAL,
+    http3_value REAL,
+    delay_ci_low REAL,
+    delay_ci_high REAL,
+    support REAL
+);
+CREATE INDEX IF NOT EXISTS crossovers_condition ON crossovers (session, metric, stat, bandwidth);
+CREATE TABLE IF NOT EXISTS crossover_probability (
+    session TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    bandwidth TEXT,
+    probability REAL
+);
+'''
+
+# 結果ストアに保存する列（結果DataFrameの列 → requestsテーブルの列）
+STORE_REQUEST_COLUMNS = {
+    'Protocol': 'protocol',
+    'Bandwidth': 'bandwidth',
+    'NetworkDelay(ms)': 'delay_ms',
+    'RequestTime': 'request_time',
+    'TTFB(ms)': 'ttfb_ms',
+    'TotalTime(ms)': 'total_time_ms',
+    'BytesReceived': 'bytes_received',
+    'StatusCode': 'status_code',
+    'Error': 'error',
+    'Throughput(KB/s)': 'throughput_kbps',
+}
+
+def open_results_store(db_path):
+    """結果ストアを開く（テーブルとインデックスがなければ作成する）"""
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    conn.executescript(RESULTS_STORE_SCHEMA)
+    return conn
+
+def sql_values(series):
+    """列の値をSQLiteに渡せるPythonの値に変換する（欠損値はNULL）"""
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # UTCのISO 8601文字列（strftimeより桁違いに速い）
+        if series.dt.tz is not None:
+            series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+        values = np.char.add(np.datetime_as_string(series.to_numpy('datetime64[us]'), unit='us'), 'Z').tolist()
+    else:
+        values = series.tolist()
+    return [None if is_missing else value for value, is_missing in zip(values, missing.tolist())]
+
+def sql_number(value):
+    """数値をSQLiteに渡せる値に変換する（欠損値・Noneはそのまま NULL）"""
+    return None if value is None or pd.isna(value) else float(value)
+
+def store_cube_rows(session, cube):
+    """集計キューブの3つの表を (session, level, protocol, bandwidth, delay_ms, metric, stat, value) の行に展開する"""
+    rows = []
+    for level in ('cells', 'bandwidth', 'protocol'):
+        table = cube[level]
+        keys = {name: table[(name, '')].tolist() if (name, '') in table.columns else [None] * len(table)
+                for name in CONDITION_KEYS}
+        for metric, stat in table.columns:
+            if stat == '':
+                continue
+            for i, value in enumerate(table[(metric, stat)].tolist()):
+                delay = keys['NetworkDelay(ms)'][i]
+                rows.append((session, level, keys['Protocol'][i], keys['Bandwidth'][i],
+                             None if delay is None else int(delay), metric, stat, sql_number(value)))
+    return rows
+
+def store_crossover_rows(session, cube):
+    """逆転地点（平均値とp99）を crossovers テーブルの行に展開する"""
+    rows = []
+    for stat, crossovers in (('mean', cube['crossovers']), (TAIL_CROSSOVER_STAT, cube['tail_crossovers'])):
+        for metric, points in crossovers.items():
+            for cp in points:
+                delay_ci = cp.get('delay_ci') or (None, None)
+                rows.append((session, metric, stat, cp['bandwidth'], float(cp['delay']), cp['direction'],
+                             float(cp['http2_value']), float(cp['http3_value']),
+                             sql_number(delay_ci[0]), sql_number(delay_ci[1]), sql_number(cp.get('support'))))
+    return rows
+
+def ingest_session(db_path, results_dir, use_cache=True, jobs=1):
+    """セッションのリクエスト行と集計キューブ・逆転地点を結果ストアに追加する（同じセッションは置き換える）"""
+    session = os.path.basename(os.path.normpath(os.path.abspath(results_dir)))
+    print(f"Loading benchmark results from {results_dir}...")
+    df = load_results(results_dir, use_cache=use_cache, jobs=jobs)
+    if df is None or len(df) == 0:
+        print(f"Warning: No data to ingest in {results_dir}")
+        return 0
+    
+    cube = build_aggregate_cube(accumulate_frame({}, df))
+    load_crossover_points(cube, results_dir)
+    
+    # セッションの開始時刻は最初のリクエストの時刻（取れない場合はディレクトリの更新時刻）
+    request_times = df['RequestTime'] if 'RequestTime' in df.columns else pd.Series(dtype='datetime64[ns, UTC]')
+    if request_times.notna().any():
+        started_at = request_times.min().strftime('%Y-%m-%dT%H:%M:%SZ')
+    else:
+        started_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(os.path.getmtime(results_dir)))
+    
+    columns = [column for column in STORE_REQUEST_COLUMNS if column in df.columns]
+    request_rows = zip(*([session] * len(df), *(sql_values(df[column]) for column in columns)))
+    probability_rows = [(session, metric, bandwidth, sql_number(p))
+                        for metric, by_bandwidth in cube['crossover_probability'].items()
+                        for bandwidth, p in by_bandwidth.items()]
+    
+    conn = open_results_store(db_path)
+    try:
+        with conn:
+            for table in ('sessions', 'requests', 'cube_stats', 'crossovers', 'crossover_probability'):
+                conn.execute(f"DELETE FROM {table} WHERE session = ?", (session,))
+            conn.execute("INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?)",
+                         (session, os.path.abspath(results_dir), started_at,
+                          time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), len(df), dataset_fingerprint(cube['cells'])))
+            target = ', '.join(['session'] + [STORE_REQUEST_COLUMNS[column] for column in columns])
+            conn.executemany(f"INSERT INTO requests ({target}) VALUES ({', '.join('?' * (len(columns) + 1))})", request_rows)
+            conn.executemany("INSERT INTO cube_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)", store_cube_rows(session, cube))
+            conn.executemany("INSERT INTO crossovers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", store_crossover_rows(session, cube))
+            conn.executemany("INSERT INTO crossover_probability VALUES (?, ?, ?, ?)", probability_rows)
+    finally:
+        conn.close()
+    print(f"Ingested {session}: {len(df)} requests -> {db_path}")
+    return len(df)
+
+def store_bandwidth_value(bandwidth):
+    """帯域幅の指定をBandwidth値に揃える（ディレクトリ名 '3Mbps' などでも指定できる）"""
+    return BANDWIDTH_DIR_MAPPING.get(bandwidth, bandwidth) if bandwidth is not None else None
+
+def query_condition_series(db_path, metric='TTFB(ms)', stat='mean', protocol=None, bandwidth=None, delay=None):
+    """条件別の統計量のセッション横断の時系列（セッション開始時刻順、単位はメトリクスのまま）"""
+    sql = ("SELECT s.started_at, c.session, c.protocol, c.bandwidth, c.delay_ms, c.value "
+           "FROM cube_stats c JOIN sessions s ON s.session = c.session "
+           "WHERE c.level = 'cells' AND c.metric = ? AND c.stat = ?")
+    params = [metric, stat]
+    for column, value in (('protocol', protocol), ('bandwidth', store_bandwidth_value(bandwidth)), ('delay_ms', delay)):
+        if value is not None:
+            sql += f" AND c.{column} = ?"
+            params.append(value)
+    sql += " ORDER BY c.protocol, c.bandwidth, c.delay_ms, s.started_at, c.session"
+    conn = open_results_store(db_path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+def query_crossover_series(db_path, metric='TTFB(ms)', stat='mean', bandwidth=None):
+    """逆転地点の遅延（ms）と信頼区間・存在確率のセッション横断の時系列"""
+    sql = ("SELECT s.started_at, x.session, x.bandwidth, x.delay_ms, x.delay_ci_low, x.delay_ci_high, "
+           "x.support, x.direction, p.probability "
+           "FROM crossovers x JOIN sessions s ON s.session = x.session "
+           "LEFT JOIN crossover_probability p ON p.session = x.session AND p.metric = x.metric AND p.bandwidth = x.bandwidth AND x.stat = 'mean' "
+           "WHERE x.metric = ? AND x.stat = ?")
+    params = [metric, stat]
+    if bandwidth is not None:
+        sql += " AND x.bandwidth = ?"
+        params.append(store_bandwidth_value(bandwidth))
+    sql += " ORDER BY x.bandwidth, s.started_at, x.session, x.delay_ms"
+    conn = open_results_store(db_path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+def print_store_query(series, crossovers, metric, stat, as_csv=False):
+    """クエリ結果を表示する（テキストは条件×セッションの表、--csv は縦持ちのCSV）"""
+    if as_csv:
+        series.assign(metric=metric, stat=stat).to_csv(sys.stdout, index=False)
+        print()
+        crossovers.assign(metric=metric, stat=stat).to_csv(sys.stdout, index=False)
+        return
+    
+    print(f"{metric} {stat} by session")
+    print("-" * 80)
+    if series.empty:
+        print("  No data")
+    else:
+        # 列はセッション開始時刻順に並べる
+        sessions = series.drop_duplicates('session').sort_values(['started_at', 'session'])['session']
+        table = series.pivot_table(index=['protocol', 'bandwidth', 'delay_ms'], columns='session', values='value')
+        print(table.reindex(columns=sessions).to_string(float_format=lambda v: f"{v:.3f}"))
+    
+    print(f"\n{metric} crossover delays ({stat}, ms) by session")
+    print("-" * 80)
+    if crossovers.empty:
+        print("  No crossover points")
+    else:
+        for _, row in crossovers.iterrows():
+            ci = (f" (95% CI {row['delay_ci_low']:.1f}-{row['delay_ci_high']:.1f}ms)"
+                  if pd.notna(row['delay_ci_low']) else '')
+            probability = f", 存在確率 {row['probability']:.0%}" if pd.notna(row['probability']) else ''
+            print(f"  {row['bandwidth']:<8} {row['started_at']}  {row['session']:<40} "
+                  f"{row['delay_ms']:6.1f}ms{ci}{probability}")
+
+# 解析の段階（analyze_session の stages に指定する。逆転地点はどの段階でも必ず求めるので段階に含めない）
+ANALYSIS_STAGES = ('consolidate', 'export', 'reports', 'graphs')
+
+def analyze_session(results_dir, df=None, accumulators=None, stages=ANALYSIS_STAGES, quality=DEFAULT_QUALITY, jobs=1,
+                    force=False, use_cache=True, streaming=False, chunksize=DEFAULT_CHUNKSIZE, profile=False, profile_memory=False,
+                    csv_reader=DEFAULT_CSV_READER):
+    """セッションを解析してレポート・グラフを出力する（読み込み済みのdfや条件別アキュムレータを渡すとCSVを読み直さない）"""
+    # session_data.arrow を指定した場合はそれを読み込み、そのファイルのあるセッションディレクトリに出力する
+    if os.path.isfile(results_dir):
+        if df is None and accumulators is None:
+            print(f"Loading {results_dir}...")
+            df = load_results(results_dir)
+        results_dir = os.path.dirname(os.path.abspath(results_dir))
+    
+    started = (time.perf_counter(), time.process_time())
+    profile = {'trace_memory': profile_memory, 'stages': []} if profile or profile_memory else None
+    
+    # 集計キューブ（全てのグラフ・レポートはこれを参照する）
+    if accumulators is None:
+        if df is not None:
+            accumulators = run_stage(profile, 'accumulate_frame', accumulate_frame, {}, df) if len(df) > 0 else {}
+        elif streaming:
+            print(f"Streaming benchmark results (chunk size: {chunksize})...")
+            accumulators = run_stage(profile, 'stream_accumulators', stream_accumulators, results_dir, chunksize)
+        else:
+            print("Loading benchmark results...")
+            df = run_stage(profile, 'load_results', load_results, results_dir, use_cache=use_cache, jobs=jobs, reader=csv_reader)
+            accumulators = run_stage(profile, 'accumulate_frame', accumulate_frame, {}, df) if df is not None and len(df) > 0 else {}
+    
+    if not accumulators:
+        print("No data to analyze")
+        print(f"Checked directory: {results_dir}")
+        return None
+    
+    cube = run_stage(profile, 'build_aggregate_cube', build_aggregate_cube, accumulators)
+    stats = cube['cells']
+    run_stage(profile, 'find_crossover_points', load_crossover_points, cube, results_dir)
+    
+    print(f"Loaded {stats[('TTFB(ms)', 'count')].sum()} records")
+    print(f"Protocols: {stats['Protocol'].unique()}")
+    print(f"Network conditions: {len(stats.groupby(['NetworkDelay(ms)', 'Bandwidth']))} patterns")
+    
+    # グラフ出力ディレクトリ
+    output_dir = os.path.join(results_dir, 'analysis')
+    print(f"\nCreating output directory: {output_dir}")
+    os.makedirs(output_dir, exist_ok=True)
+    
+    manifest = load_analysis_manifest(results_dir)
+    
+    # 帯域幅ごとのbenchmark_results.csv（読み込み済みの行から作るため、ストリーミング集計時などは作らない）
+    if 'consolidate' in stages:
+        if df is not None:
+            print("\nConsolidating results by bandwidth...")
+            manifest.update(run_stage(profile, 'consolidate_results', consolidate_results, df, results_dir,
+                                      None if force else manifest))
+        else:
+            print(f"\nSkipping {CONSOLIDATED_RESULTS_FILE} (result rows are not loaded)")
+    
+    # リクエスト単位の結果と集計キューブのArrow IPCファイル
+    if 'export' in stages:
+        if df is not None:
+            print("\nExporting session data (Arrow IPC)...")
+            manifest.update(run_stage(profile, 'export_session_arrow', export_session_arrow, df, cube, results_dir,
+                                      None if force else manifest))
+        else:
+            print(f"\nSkipping {SESSION_DATA_FILE} (result rows are not loaded)")
+    
+    print("\nGenerating analysis...")
+    tasks = build_analysis_tasks(cube, results_dir, output_dir, reports_only='graphs' not in stages, quality=quality)
+    tasks = [task for task in tasks if task['kind'] == 'setup' or task['kind'] in stages]
+    unchanged = {} if force else find_unchanged_tasks(tasks, manifest, results_dir)
+    results = run_task_graph(tasks, jobs=jobs, done=unchanged, profile=profile)
+    update_analysis_manifest(tasks, results, manifest, results_dir)
+    print_task_summary(tasks, results)
+    
+    report = None
+    if profile is not None:
+        profile['stages'].extend(task_profile(tasks, results))
+        options = {'jobs': jobs, 'streaming': streaming, 'csv_reader': csv_reader, 'quality': quality, 'stages': list(stages),
+                   'force': force, 'cache': use_cache}
+        report = write_analysis_profile(results_dir, profile, options, stats[('TTFB(ms)', 'count')].sum(), started)
+        print_profile_summary(report)
+    
+    return {'cube': cube, 'accumulators': accumulators, 'tasks': tasks, 'results': results,
+            'output_dir': output_dir, 'profile': report}
+
+# analyze-server（serve）の待ち受けソケット
+DEFAULT_SERVER_SOCKET = '/tmp/analyze_results.sock'
+# serve で集計結果を保持するセッション数（古いものから破棄する）
+SERVER_SESSION_LIMIT = 8
+
+# serve で保持するセッションごとの集計 {絶対パス: (結果CSVの署名, 条件別アキュムレータ)}
+SERVER_SESSIONS = {}
+
+def result_files_signature(results_dir):
+    """結果CSVの一覧とmtime・サイズ（変わっていなければ前回の集計を再利用できる）"""
+    return tuple((os.path.relpath(file, results_dir), *_file_signature(file)) for file in find_result_files(results_dir))
+
+def receive_line(conn):
+    """ソケットから改行までの1メッセージを受け取る"""
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b'\n'):
+            break
+    return b''.join(chunks).decode('utf-8')
+
+def send_line(conn, message):
+    """1メッセージを改行区切りのJSONとして送る（analyze_client.py も同じ形式で送受信する）"""
+    conn.sendall(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+
+def server_running(socket_path):
+    """ソケットで待ち受けているanalyze-serverがあるか"""
+    import socket
+    if not os.path.exists(socket_path):
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+            return True
+        except OSError:
+            return False
+
+def serve_request(request, jobs=1):
+    """analyze-server への解析要求を1件処理し、応答（ok・出力・所要時間）を返す"""
+    start = time.perf_counter()
+    results_dir = os.path.abspath(request.get('results_dir', ''))
+    output = io.StringIO()
+    ok = False
+    try:
+        with contextlib.redirect_stdout(output):
+            stages = request.get('stages', ANALYSIS_STAGES)
+            quality = request.get('quality', DEFAULT_QUALITY)
+            if not os.path.isdir(results_dir):
+                print(f"Error: '{results_dir}' is not a session directory")
+            elif quality not in RENDER_PROFILES or not set(stages) <= set(ANALYSIS_STAGES):
+                print(f"Error: Invalid quality '{quality}' or stages {stages}")
+            else:
+                # 結果CSVが前回の要求から変わっていなければ集計を再利用する
+                signature = result_files_signature(results_dir)
+                cached = SERVER_SESSIONS.pop(results_dir, None)
+                accumulators = cached[1] if cached is not None and cached[0] == signature else None
+                if accumulators is not None:
+                    print("Reusing aggregates from the previous request")
+                SMOOTHED_CURVES.clear()
+                
+                analysis = analyze_session(results_dir, accumulators=accumulators, stages=stages, quality=quality,
+                                           force=request.get('force', False), use_cache=request.get('cache', True), jobs=jobs)
+                if analysis is not None:
+                    SERVER_SESSIONS[results_dir] = (signature, analysis['accumulators'])
+                    while len(SERVER_SESSIONS) > SERVER_SESSION_LIMIT:
+                        SERVER_SESSIONS.pop(next(iter(SERVER_SESSIONS)))
+                    ok = all(result['status'] in ('ok', 'unchanged') for result in analysis['results'].values())
+    except Exception:
+        output.write(traceback.format_exc())
+    return {'ok': ok, 'output': output.getvalue(), 'seconds': time.perf_counter() - start}
+
+def serve(socket_path=DEFAULT_SERVER_SOCKET, jobs=1):
+    """pandas・matplotlib・scipyを読み込んだ状態でUnixソケットの解析要求を待ち受ける（1件ずつ順に処理する）"""
+    import socket
+    if server_running(socket_path):
+        print(f"Error: Analyze server is already running on {socket_path}")
+        sys.exit(1)
+    if os.path.exists(socket_path):
+        # 前回異常終了したサーバーのソケットファイル
+        os.remove(socket_path)
+    
+    load_plotting()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen()
+    print(f"Analyze server listening on {socket_path} (Ctrl+C to stop)...")
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                # 接続の確認（server_running）のように何も送らずに切断した場合や、
+                # 応答前にクライアントが終了した場合もサーバーは動かし続ける
+                try:
+                    message = receive_line(conn)
+                    if not message.strip():
+                        continue
+                    try:
+                        request = json.loads(message)
+                    except ValueError as e:
+                        send_line(conn, {'ok': False, 'output': f"Error: Invalid request: {e}\n", 'seconds': 0.0})
+                        continue
+                    if request.get('command') == 'shutdown':
+                        send_line(conn, {'ok': True, 'output': "Analyze server stopped\n", 'seconds': 0.0})
+                        break
+                    response = serve_request(request, jobs)
+                    print(f"[{time.strftime('%H:%M:%S')}] {request.get('results_dir')}: "
+                          f"{'ok' if response['ok'] else 'failed'} in {response['seconds']:.2f}s")
+                    send_line(conn, response)
+                except OSError as e:
+                    print(f"Warning: Lost connection to client: {e}")
+    except KeyboardInterrupt:
+        print("\nStopped analyze server")
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description='HTTP/2 vs HTTP/3 ベンチマーク結果の分析')
+    parser.add_argument('results_dir', help=f'セッションディレクトリ（session_XXX）、またはその{SESSION_DATA_FILE}')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='読み込みキャッシュ（.analysis_cache/）を使わずに全CSVを再解析する')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='CSV解析とグラフ・レポート生成に使うプロセス数（デフォルト: 1）')
+    parser.add_argument('--csv-reader', choices=CSV_READERS, default=DEFAULT_CSV_READER,
+                        help='結果CSVの解析方法（pyarrow: マルチスレッドのArrowパーサー、pandas: pd.read_csv、'
+                             f'auto: pyarrowがあればpyarrow、デフォルト: {DEFAULT_CSV_READER}）')
+    parser.add_argument('--streaming', action='store_true',
+                        help='CSVをチャンク単位で読み込み、条件別に逐次集計する（メモリ使用量一定）')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, metavar='ROWS',
+                        help=f'ストリーミング集計で1度に読み込む行数（デフォルト: {DEFAULT_CHUNKSIZE}）')
+    parser.add_argument('--quality', choices=sorted(RENDER_PROFILES), default=DEFAULT_QUALITY,
+                        help=f'グラフの描画品質（preview: 低解像度PNG, publication: 300dpi PNG, vector: SVG、デフォルト: {DEFAULT_QUALITY}）')
+    parser.add_argument('--reports-only', action='store_true',
+                        help='テキストレポートのみを生成する（matplotlib・scipyを読み込まないため起動が速い）')
+    parser.add_argument('--stages', nargs='+', choices=ANALYSIS_STAGES, default=list(ANALYSIS_STAGES),
+                        help='実行する段階（デフォルト: 全て、--reports-only は graphs を除いたものと同じ）')
+    parser.add_argument('--watch', action='store_true',
+                        help=f'実行中のセッションの結果CSVを監視し、追記された行を集計して{LIVE_SUMMARY_FILE}を更新し続ける')
+    parser.add_argument('--interval', type=float, default=DEFAULT_WATCH_INTERVAL, metavar='SECONDS',
+                        help=f'--watch で結果CSVを確認する間隔（デフォルト: {DEFAULT_WATCH_INTERVAL}秒）')
+    parser.add_argument('--force', action='store_true',
+                        help=f'入力が変わっていない出力も含め、全てのグラフ・レポートを再生成する（{ANALYSIS_MANIFEST_FILE}を無視）')
+    parser.add_argument('--profile', action='store_true',
+                        help=f'段階ごとの経過時間・CPU時間・最大RSSを計測し{ANALYSIS_PROFILE_FILE}に書き出す')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='--profile に加えてtracemallocで段階ごとのPythonのメモリ確保量のピークを計測する（数倍遅くなる）')
+    return parser.parse_args(argv)
+
+# セッションディレクトリの代わりに第1引数で指定するサブコマンド
+STORE_COMMANDS = ('ingest', 'query')
+
+def parse_store_args(argv):
+    """結果ストアのサブコマンド（ingest / query）の引数を解析する"""
+    parser = argparse.ArgumentParser(description='HTTP/2 vs HTTP/3 ベンチマーク結果のセッション横断ストア（SQLite）')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    ingest = commands.add_parser('ingest', help='セッションのリクエスト行と集計キューブを結果ストアに追加する')
+    ingest.add_argument('db', help='結果ストアのSQLiteファイル（なければ作成）')
+    ingest.add_argument('results_dirs', nargs='+', metavar='results_dir', help='セッションディレクトリ（session_XXX）')
+    ingest.add_argument('--no-cache', action='store_true',
+                        help='読み込みキャッシュ（.analysis_cache/）を使わずに全CSVを再解析する')
+    ingest.add_argument('--jobs', type=int, default=1, metavar='N', help='CSV解析に使うプロセス数（デフォルト: 1）')
+    
+    query = commands.add_parser('query', help='条件別の統計量と逆転地点の遅延をセッション横断の時系列で表示する')
+    query.add_argument('db', help='結果ストアのSQLiteファイル')
+    query.add_argument('--metric', choices=CROSSOVER_METRICS, default='TTFB(ms)', help='メトリクス（デフォルト: TTFB(ms)）')
+    query.add_argument('--stat', choices=['mean', TAIL_CROSSOVER_STAT], default='mean',
+                       help='比較する統計量（デフォルト: mean）')
+    query.add_argument('--protocol', help='プロトコルで絞り込む（例: HTTP/3.0）')
+    query.add_argument('--bandwidth', help='帯域幅で絞り込む（例: 3mbit または 3Mbps）')
+    query.add_argument('--delay', type=int, metavar='MS', help='遅延（ms）で絞り込む')
+    query.add_argument('--csv', action='store_true', help='縦持ちのCSVとして標準出力に書き出す')
+    return parser.parse_args(argv)
+
+def store_main(argv):
+    """結果ストアのサブコマンドを実行する"""
+    args = parse_store_args(argv)
+    if args.command == 'ingest':
+        for results_dir in args.results_dirs:
+            if not os.path.isdir(results_dir):
+                print(f"Warning: Directory '{results_dir}' does not exist, skipping")
+                continue
+            ingest_session(args.db, results_dir, use_cache=not args.no_cache, jobs=args.jobs)
+        return
+    
+    if not os.path.exists(args.db):
+        print(f"Error: Results store '{args.db}' does not exist")
+        sys.exit(1)
+    series = query_condition_series(args.db, args.metric, args.stat, args.protocol, args.bandwidth, args.delay)
+    crossovers = query_crossover_series(args.db, args.metric, args.stat, args.bandwidth)
+    print_store_query(series, crossovers, args.metric, args.stat, as_csv=args.csv)
+
+def parse_serve_args(argv):
+    """analyze-server（serve）の引数を解析する"""
+    parser = argparse.ArgumentParser(description='pandas・matplotlib・scipyを読み込んだままUnixソケットで解析要求を待ち受ける')
+    parser.add_argument('command', choices=['serve'])
+    parser.add_argument('--socket', default=DEFAULT_SERVER_SOCKET, help=f'待ち受けるソケット（デフォルト: {DEFAULT_SERVER_SOCKET}）')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N', help='CSV解析とグラフ・レポート生成に使うプロセス数（デフォルト: 1）')
+    parser.add_argument('--stop', action='store_true', help='起動中のサーバーを停止する')
+    return parser.parse_args(argv)
+
+def serve_main(argv):
+    """analyze-server を起動（--stop の場合は停止）する"""
+    args = parse_serve_args(argv)
+    if not args.stop:
+        serve(args.socket, args.jobs)
+        return
+    import socket
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(args.socket)
+            send_line(client, {'command': 'shutdown'})
+            print(json.loads(receive_line(client))['output'], end='')
+    except OSError as e:
+        print(f"Warning: Analyze server is not running on {args.socket}: {e}")
+
 def main():
     try:
-        if len(sys.argv) < 2:
-            print("Usage: python analyze_results.py <results_directory>")
-            sys.exit(1)
+        if len(sys.argv) >= 2 and sys.argv[1] in STORE_COMMANDS:
+            store_main(sys.argv[1:])
+            return
+        if len(sys.argv) >= 2 and sys.argv[1] == 'serve':
+            serve_main(sys.argv[1:])
+            return
         
-        results_dir = sys.argv[1]
+        args = parse_args()
+        results_dir = args.results_dir
+        stages = [stage for stage in args.stages if stage != 'graphs'] if args.reports_only else args.stages
         
         if not os.path.exists(results_dir):
             print(f"Error: Directory '{results_dir}' does not exist")
@@ -1580,132 +3573,23 @@ def main():
             print(f"Looking for: {os.path.abspath(results_dir)}")
             sys.exit(1)
         
-        print("Loading benchmark results...")
-        df = load_results(results_dir)
-        
-        if df is None or len(df) == 0:
-            print("No data to analyze")
-            print(f"Checked directory: {results_dir}")
+        # ファイルを指定できるのは export で書き出したArrow IPCファイル（--watch 以外）だけ
+        if os.path.isfile(results_dir) and (args.watch or not results_dir.endswith(ARROW_FILE_SUFFIXES)):
+            print(f"Error: '{results_dir}' is not a session directory"
+                  + ("" if args.watch else f" or an Arrow IPC file ({SESSION_DATA_FILE})"))
             sys.exit(1)
         
-        print(f"Loaded {len(df)} records")
-        print(f"Protocols: {df['Protocol'].unique()}")
-        print(f"Network conditions: {len(df.groupby(['NetworkDelay(ms)', 'Bandwidth']))} patterns")
-        
-        # グラフ出力ディレクトリ
-        output_dir = os.path.join(results_dir, 'analysis')
-        print(f"\nCreating output directory: {output_dir}")
-        os.makedirs(output_dir, exist_ok=True)
+        # セッション実行中のライブ集計（Ctrl+Cで終了）
+        if args.watch:
+            watch_results(results_dir, args.interval)
+            return
         
-        # ディレクトリが作成されたか確認
-        if not os.path.exists(output_dir):
-            print(f"Error: Failed to create directory: {output_dir}")
+        analysis = analyze_session(results_dir, stages=stages, quality=args.quality, jobs=args.jobs, force=args.force,
+                                   use_cache=not args.no_cache, streaming=args.streaming, chunksize=args.chunksize,
+                                   profile=args.profile, profile_memory=args.profile_memory, csv_reader=args.csv_reader)
+        if analysis is None:
             sys.exit(1)
-        
-        print("\nGenerating analysis...")
-        
-        # 全体のグラフを生成（セッションディレクトリのanalysisフォルダに）
-        try:
-            plot_ttfb_comparison(df, output_dir)
-        except Exception as e:
-            print(f"Warning: Failed to generate TTFB comparison: {e}")
-        
-        try:
-            plot_throughput_comparison(df, output_dir)
-        except Exception as e:
-            print(f"Warning: Failed to generate throughput comparison: {e}")
-        
-        try:
-            print("Generating Total Time comparison graph...")
-            plot_total_time_comparison(df, output_dir)
-            print("Total Time comparison graph generated successfully!")
-        except Exception as e:
-            print(f"Warning: Failed to generate Total Time comparison: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        # 帯域幅ごとのレポート、CSV、グラフを生成
-        # Bandwidthを文字列に統一してからソート
-        unique_bandwidths = [str(bw) for bw in df['Bandwidth'].unique()]
-        unique_bandwidths = sorted(set(unique_bandwidths))
-        for bandwidth in unique_bandwidths:
-            try:
-                # 帯域幅ディレクトリを探す
-                bandwidth_name = bandwidth if bandwidth != '0' else '無制限'
-                if bandwidth == '1mbit':
-                    bandwidth_name = '1Mbps'
-                elif bandwidth == '2mbit':
-                    bandwidth_name = '2Mbps'
-                elif bandwidth == '3mbit':
-                    bandwidth_name = '3Mbps'
-                
-                bw_dir = os.path.join(results_dir, bandwidth_name)
-                if not os.path.exists(bw_dir):
-                    # ディレクトリが存在しない場合は作成
-                    os.makedirs(bw_dir, exist_ok=True)
-                
-                # 1. サマリーレポートを生成（各帯域幅ディレクトリ直下に）
-                print(f"\nGenerating summary report for {bandwidth_name}...")
-                generate_bandwidth_report(df, bandwidth, bw_dir)
-                
-                # 2. TTFB比較グラフを生成（各帯域幅ディレクトリ直下に）
-                print(f"Generating TTFB comparison graph for {bandwidth_name}...")
-                try:
-                    plot_bandwidth_ttfb_comparison(df, bandwidth, bw_dir)
-                except Exception as e:
-                    print(f"Warning: Failed to generate TTFB comparison for {bandwidth_name}: {e}")
-                    import traceback
-                    traceback.print_exc()
-                
-                # 3. Response Time比較グラフを生成（各帯域幅ディレクトリ直下に）
-                print(f"Generating response time comparison graph for {bandwidth_name}...")
-                try:
-                    plot_bandwidth_response_time_comparison(df, bandwidth, bw_dir)
-                except Exception as e:
-                    print(f"Warning: Failed to generate response time comparison for {bandwidth_name}: {e}")
-                    import traceback
-                    traceback.print_exc()
-                
-                # 4. スループット比較グラフを生成（各帯域幅ディレクトリ直下に）
-                print(f"Generating throughput comparison graph for {bandwidth_name}...")
-                try:
-                    plot_bandwidth_throughput_comparison(df, bandwidth, bw_dir)
-                except Exception as e:
-                    print(f"Warning: Failed to generate throughput comparison for {bandwidth_name}: {e}")
-                    import traceback
-                    traceback.print_exc()
-                
-                # 5. 性能逆転地点レポートを生成（各帯域幅ディレクトリ直下に）
-                print(f"Generating crossover points report for {bandwidth_name}...")
-                try:
-                    generate_bandwidth_crossover_report(df, bandwidth, bw_dir)
-                except Exception as e:
-                    print(f"Warning: Failed to generate crossover points report for {bandwidth_name}: {e}")
-                    import traceback
-                    traceback.print_exc()
-                
-            except Exception as e:
-                print(f"Warning: Failed to generate reports for {bandwidth}: {e}")
-                import traceback
-                traceback.print_exc()
-        
-        # 総合レポートを生成（ルートディレクトリにtotal_report.txt）
-        print("\nGenerating total report...")
-        try:
-            generate_summary_report(df, results_dir)
-        except Exception as e:
-            print(f"Warning: Failed to generate total report: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        # 帯域幅別の逆転地点グラフを生成（sessionディレクトリ直下に）
-        print("\nGenerating crossover points by bandwidth graph...")
-        try:
-            plot_crossover_points_by_bandwidth(df, results_dir)
-        except Exception as e:
-            print(f"Warning: Failed to generate crossover points by bandwidth graph: {e}")
-            import traceback
-            traceback.print_exc()
+        output_dir = analysis['output_dir']
         
         print("\n" + "=" * 80)
         print("Analysis completed!")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+analyze_results.py のスケーリング計測スクリプト
+合成セッション（generate_sessions.py）を行数を変えて生成し、読み込み・集計・逆転地点・各グラフ・各レポートの
+所要時間をJSONに書き出す
+"""
+
+import argparse
+import importlib.metadata
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import analyze_results
+import generate_sessions
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_OUTPUT = 'analyzer_benchmark.json'
+
+def timed(stages, stage, func, *args, **kwargs):
+    """関数を実行して所要時間（秒）をstagesに記録し、戻り値を返す"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    stages[stage] = time.perf_counter() - start
+    return result
+
+def benchmark_session(session_dir, quality=analyze_results.DEFAULT_QUALITY, jobs=1):
+    """1つのセッションについて解析の各段階と各グラフ・レポートの所要時間を計測する"""
+    stages = {}
+    analyze_results.SMOOTHED_CURVES.clear()
+
+    # 読み込み（キャッシュなしでCSVの読み込み方法ごと→キャッシュ作成→キャッシュから）とストリーミング集計
+    for reader in analyze_results.CSV_READERS[1:]:
+        if reader == 'pyarrow' and not analyze_results._pyarrow_available():
+            continue
+        timed(stages, f'load_results (no cache, {reader})', analyze_results.load_results, session_dir,
+              use_cache=False, jobs=jobs, reader=reader)
+    timed(stages, 'load_results (write cache)', analyze_results.load_results, session_dir, jobs=jobs)
+    df = timed(stages, 'load_results (cached)', analyze_results.load_results, session_dir, jobs=jobs)
+    timed(stages, 'streaming aggregation', analyze_results.stream_accumulators, session_dir)
+
+    accumulators = timed(stages, 'aggregation', analyze_results.accumulate_frame, {}, df)
+    cube = timed(stages, 'aggregate cube', analyze_results.build_aggregate_cube, accumulators)
+    timed(stages, 'crossover points', analyze_results.load_crossover_points, cube)
+    timed(stages, 'consolidation', analyze_results.consolidate_results, df, session_dir)
+
+    # グラフ・レポートはタスクごとに計測する
+    output_dir = os.path.join(session_dir, 'analysis')
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = analyze_results.build_analysis_tasks(cube, session_dir, output_dir, quality=quality)
+    results = timed(stages, 'all tasks', analyze_results.run_task_graph, tasks, jobs=jobs)
+    return len(df), stages, results
+
+def environment_info():
+    """計測環境の情報"""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'pyarrow': importlib.metadata.version('pyarrow') if analyze_results._pyarrow_available() else None,
+    }
+
+def print_benchmark_table(runs):
+    """行数ごとの主要な段階の所要時間を表示する"""
+    # (表の見出し, 段階名)
+    columns = [('generate', 'generate'), ('csv pandas', 'load_results (no cache, pandas)'),
+               ('csv pyarrow', 'load_results (no cache, pyarrow)'), ('cached', 'load_results (cached)'),
+               ('streaming', 'streaming aggregation'), ('aggregation', 'aggregation'), ('cube', 'aggregate cube'),
+               ('crossovers', 'crossover points'), ('consolidation', 'consolidation'), ('all tasks', 'all tasks')]
+    print("\nBenchmark summary (seconds):")
+    print("-" * 80)
+    print(f"{'rows':>10} " + ' '.join(f"{label:>13}" for label, _ in columns))
+    for run in runs:
+        print(f"{run['rows']:>10} " + ' '.join(f"{run['stages'].get(name, float('nan')):>13.3f}" for _, name in columns))
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description='analyze_results.py の行数に対するスケーリングを計測する')
+    parser.add_argument('--sizes', type=float, nargs='+', default=DEFAULT_SIZES, metavar='ROWS',
+                        help='セッション全体の行数（デフォルト: 1e3 1e4 1e5 1e6 1e7）')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f'計測結果のJSON（デフォルト: {DEFAULT_OUTPUT}）')
+    parser.add_argument('--work-dir', help='合成セッションを生成するディレクトリ（デフォルト: 一時ディレクトリ）')
+    parser.add_argument('--keep', action='store_true', help='計測後に合成セッションを削除しない')
+    parser.add_argument('--model', choices=sorted(generate_sessions.LATENCY_MODELS), default='crossover',
+                        help='合成セッションの遅延モデル（デフォルト: crossover）')
+    parser.add_argument('--quality', choices=sorted(analyze_results.RENDER_PROFILES), default=analyze_results.DEFAULT_QUALITY,
+                        help=f'グラフの描画品質（デフォルト: {analyze_results.DEFAULT_QUALITY}）')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N', help='CSV解析とグラフ・レポート生成のプロセス数（デフォルト: 1）')
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='analyzer_benchmark_')
+    os.makedirs(work_dir, exist_ok=True)
+    conditions = len(generate_sessions.DEFAULT_DELAYS) * len(generate_sessions.DEFAULT_BANDWIDTHS) * len(generate_sessions.PROTOCOLS)
+
+    # フォントの解決・matplotlibの読み込みは1回だけなので計測から除く
+    load_start = time.perf_counter()
+    analyze_results.load_plotting()
+    report = {
+        'environment': environment_info(),
+        'quality': args.quality,
+        'jobs': args.jobs,
+        'model': args.model,
+        'load_plotting': time.perf_counter() - load_start,
+        'runs': [],
+    }
+
+    try:
+        for size in args.sizes:
+            rows = max(1, round(size / conditions))
+            print(f"\n{'=' * 80}\nBenchmarking {rows * conditions} rows ({rows} per condition and protocol)\n{'=' * 80}")
+            stages = {}
+            session_dir = timed(stages, 'generate', generate_sessions.generate_session, work_dir, rows,
+                                model=args.model, name=f'bench{rows}')
+            total_rows, analysis_stages, results = benchmark_session(session_dir, quality=args.quality, jobs=args.jobs)
+            stages.update(analysis_stages)
+            report['runs'].append({'rows': total_rows, 'rows_per_condition': rows, 'stages': stages, 'tasks': results})
+
+            # 長い計測が途中で止まっても、それまでの結果は残す
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            if not args.keep:
+                shutil.rmtree(session_dir, ignore_errors=True)
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_benchmark_table(report['runs'])
+    print(f"\nSaved: {args.output}")
+
+if __name__ == '__main__':
+    main()
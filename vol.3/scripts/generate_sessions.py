@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+HTTP/2 vs HTTP/3 ベンチマークの合成セッション生成スクリプト
+run-experiments.sh と同じディレクトリ構造（session_XXX/◯Mbps/Experiment/◯ms/http{2,3}_results.csv）に、
+metrics.go と同じ形式のCSVを書き出す（analyze_results.py のスケーリング計測用）
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# run-experiments.sh の条件（帯域幅の値 → ディレクトリ名）
+DEFAULT_DELAYS = [0, 20, 40, 60, 80, 100]
+DEFAULT_BANDWIDTHS = ['0', '1mbit', '2mbit', '3mbit']
+BANDWIDTH_DIR_NAMES = {
+    '0': '無制限',
+    '1mbit': '1Mbps',
+    '2mbit': '2Mbps',
+    '3mbit': '3Mbps',
+}
+
+# metrics.go のCSVヘッダー
+CSV_COLUMNS = ['Protocol', 'RequestTime', 'TTFB(ms)', 'TotalTime(ms)', 'BytesReceived',
+               'StatusCode', 'Error', 'NetworkDelay(ms)', 'Bandwidth', 'Throughput(KB/s)']
+
+PROTOCOLS = {
+    'http2_results.csv': 'HTTP/2.0',
+    'http3_results.csv': 'HTTP/3.0',
+}
+
+# 帯域幅制限なしの場合に仮定するリンク速度（kbit/s）
+UNLIMITED_BANDWIDTH_KBPS = 1_000_000
+
+# run-experiments.sh で計測するサーバー
+SERVER_URLS = {
+    'HTTP/2.0': 'https://172.20.0.10:2000/',
+    'HTTP/3.0': 'https://172.20.0.11:3000/',
+}
+
+# 計測の間の待ち時間（秒、run-benchmark.sh のプロトコル間と run-experiments.sh の条件間の sleep）
+PROTOCOL_PAUSE_S = 2
+CONDITION_PAUSE_S = 3
+
+# 失敗したリクエストに記録するエラー（benchmark-client の client.Get のエラー形式）
+ERROR_MESSAGE = 'Get "{url}": timeout: no recent network activity'
+
+def bandwidth_kbps(bandwidth):
+    """tcの帯域幅指定（'3mbit' など）をkbit/sに変換する（'0' は制限なし）"""
+    value = bandwidth.lower()
+    for suffix, scale in (('gbit', 1_000_000), ('mbit', 1000), ('kbit', 1)):
+        if value.endswith(suffix):
+            return float(value[:-len(suffix)]) * scale
+    return float(value) / 1000 if float(value) > 0 else UNLIMITED_BANDWIDTH_KBPS
+
+def transfer_ms(response_bytes, bandwidth):
+    """レスポンスの転送にかかる時間（ms）"""
+    return response_bytes * 8 / bandwidth_kbps(bandwidth)
+
+def linear_model(protocol, delay, bandwidth, response_bytes, n, rng):
+    """往復回数に比例する単純なモデル（HTTP/2はTCP+TLSで2往復、HTTP/3はQUICで1往復）"""
+    round_trips = 2.0 if protocol == 'HTTP/2.0' else 1.0
+    ttfb = 2.0 + round_trips * delay + rng.normal(0, 1.0, n)
+    total = ttfb + transfer_ms(response_bytes, bandwidth) * rng.uniform(1.0, 1.1, n)
+    return ttfb, total
+
+def crossover_model(protocol, delay, bandwidth, response_bytes, n, rng):
+    """遅延が大きいほどHTTP/3のユーザー空間処理・輻輳制御の不利が増え、途中で性能が逆転するモデル"""
+    if protocol == 'HTTP/2.0':
+        ttfb = 5.0 + 2.0 * delay + rng.normal(0, 3.0, n)
+        slowdown = 1.0
+    else:
+        ttfb = 8.0 + 1.6 * delay + 0.004 * delay ** 2 + rng.normal(0, 3.0, n)
+        slowdown = 1.0 + delay / 200
+    total = ttfb + transfer_ms(response_bytes, bandwidth) * slowdown * rng.uniform(1.0, 1.2, n)
+    return ttfb, total
+
+def heavy_tail_model(protocol, delay, bandwidth, response_bytes, n, rng):
+    """crossoverモデルに対数正規分布の遅延（再送・キューイング）を重ねたテールの重いモデル"""
+    ttfb, total = crossover_model(protocol, delay, bandwidth, response_bytes, n, rng)
+    stall = rng.lognormal(mean=np.log(1 + delay / 10), sigma=1.0, size=n) * (rng.random(n) < 0.05)
+    return ttfb + stall, total + stall
+
+LATENCY_MODELS = {
+    'linear': linear_model,
+    'crossover': crossover_model,
+    'heavy-tail': heavy_tail_model,
+}
+
+def format_request_time(request_time):
+    """datetime64[us]（UTC）をGoの time.RFC3339Nano と同じ文字列にする（小数部の末尾の0と、0だけの小数部は省く）"""
+    text = np.char.rstrip(np.char.rstrip(np.datetime_as_string(request_time, unit='us'), '0'), '.')
+    return np.char.add(text, 'Z')
+
+def generate_results(protocol, delay, bandwidth, rows, model='crossover', error_rate=0.01,
+                     response_bytes=102400, start=None, rng=None):
+    """1条件・1プロトコル分の結果をmetrics.goと同じ列・値の形式で生成する"""
+    rng = rng if rng is not None else np.random.default_rng()
+    ttfb, total = LATENCY_MODELS[model](protocol, delay, bandwidth, response_bytes, rows, rng)
+    ttfb = np.maximum(ttfb, 0.1)
+    total = np.maximum(total, ttfb)
+
+    # リクエストは前のリクエストの完了から10ms後に開始する（benchmark-client と同じ）
+    start = start if start is not None else pd.Timestamp.now(tz='UTC').floor('s')
+    offsets = np.concatenate([[0.0], np.cumsum(total[:-1] + 10.0)])
+    request_time = start.tz_convert(None).to_datetime64() + (offsets * 1000).astype('timedelta64[us]')
+
+    # 失敗したリクエストはTTFB・ステータスコード・受信バイト数が0（metrics.go の Record と同じ）
+    failed = rng.random(rows) < error_rate
+    ttfb[failed] = 0.0
+    status = np.where(failed, 0, 200)
+    received = np.where(failed, 0, response_bytes)
+    throughput = received / 1024 / (total / 1000)
+    error = np.where(failed, ERROR_MESSAGE.format(url=SERVER_URLS[protocol]), '')
+
+    return pd.DataFrame({
+        'Protocol': protocol,
+        'RequestTime': format_request_time(request_time),
+        'TTFB(ms)': np.round(ttfb, 3),
+        'TotalTime(ms)': np.round(total, 3),
+        'BytesReceived': received,
+        'StatusCode': status,
+        'Error': error,
+        'NetworkDelay(ms)': delay,
+        'Bandwidth': bandwidth,
+        'Throughput(KB/s)': np.char.mod('%.2f', throughput),
+    }, columns=CSV_COLUMNS)
+
+def generate_session(output_root, rows, delays=None, bandwidths=None, model='crossover', error_rate=0.01,
+                     response_bytes=102400, seed=0, name='synthetic'):
+    """セッションディレクトリを1つ生成し、そのパスを返す（rowsは1条件・1プロトコルあたりの行数）"""
+    delays = DEFAULT_DELAYS if delays is None else delays
+    bandwidths = DEFAULT_BANDWIDTHS if bandwidths is None else bandwidths
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp.now(tz='UTC').floor('s')
+    session_dir = os.path.join(output_root, f"session_{start.strftime('%Y%m%d_%H%M%S')}_{name}")
+    os.makedirs(session_dir, exist_ok=True)
+
+    with open(os.path.join(session_dir, 'session_info.txt'), 'w', encoding='utf-8') as f:
+        f.write(f"Session Name: {name}\n")
+        f.write(f"Start Time: {start.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"Requests per condition: {rows}\n")
+        f.write(f"Total conditions: {len(delays) * len(bandwidths)}\n")
+        f.write(f"Delays: {' '.join(str(delay) for delay in delays)}\n")
+        f.write(f"Bandwidths: {' '.join(BANDWIDTH_DIR_NAMES.get(bw, bw) for bw in bandwidths)}\n")
+        f.write(f"Synthetic: model={model}, error_rate={error_rate}, seed={seed}\n")
+
+    # 条件・プロトコルは run-experiments.sh と同じ順に1つずつ計測するので、開始時刻を前の計測の所要時間だけずらす
+    request_start = start
+    for bandwidth in bandwidths:
+        for delay in delays:
+            experiment_dir = os.path.join(session_dir, BANDWIDTH_DIR_NAMES.get(bandwidth, bandwidth), 'Experiment', f'{delay}ms')
+            os.makedirs(experiment_dir, exist_ok=True)
+            for i, (filename, protocol) in enumerate(PROTOCOLS.items()):
+                df = generate_results(protocol, delay, bandwidth, rows, model=model, error_rate=error_rate,
+                                      response_bytes=response_bytes, start=request_start, rng=rng)
+                df.to_csv(os.path.join(experiment_dir, filename), index=False, float_format='%.3f')
+                pause = PROTOCOL_PAUSE_S if i < len(PROTOCOLS) - 1 else CONDITION_PAUSE_S
+                request_start += pd.Timedelta(milliseconds=float((df['TotalTime(ms)'] + 10.0).sum())) + pd.Timedelta(seconds=pause)
+
+    return session_dir
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description='HTTP/2 vs HTTP/3 ベンチマークの合成セッションを生成する')
+    parser.add_argument('output_root', help='セッションディレクトリを作成するディレクトリ（例: results）')
+    parser.add_argument('--rows', type=int, default=100, metavar='N',
+                        help='1条件・1プロトコルあたりのリクエスト数（デフォルト: 100）')
+    parser.add_argument('--delays', type=int, nargs='+', default=DEFAULT_DELAYS, metavar='MS',
+                        help=f"遅延条件（デフォルト: {' '.join(map(str, DEFAULT_DELAYS))}）")
+    parser.add_argument('--bandwidths', nargs='+', default=DEFAULT_BANDWIDTHS, metavar='BW',
+                        help=f"帯域幅条件（tcの指定、デフォルト: {' '.join(DEFAULT_BANDWIDTHS)}）")
+    parser.add_argument('--model', choices=sorted(LATENCY_MODELS), default='crossover',
+                        help='遅延モデル（デフォルト: crossover）')
+    parser.add_argument('--error-rate', type=float, default=0.01, help='失敗するリクエストの割合（デフォルト: 0.01）')
+    parser.add_argument('--response-bytes', type=int, default=102400, help='レスポンスサイズ（デフォルト: 102400）')
+    parser.add_argument('--seed', type=int, default=0, help='乱数のシード（デフォルト: 0）')
+    parser.add_argument('--name', default='synthetic', help='セッション名（デフォルト: synthetic）')
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    session_dir = generate_session(args.output_root, args.rows, args.delays, args.bandwidths, model=args.model,
+                                   error_rate=args.error_rate, response_bytes=args.response_bytes,
+                                   seed=args.seed, name=args.name)
+    total_rows = args.rows * len(args.delays) * len(args.bandwidths) * len(PROTOCOLS)
+    print(f"Generated {total_rows} requests in {time.perf_counter() - start:.2f}s: {session_dir}")
+
+if __name__ == '__main__':
+    main()
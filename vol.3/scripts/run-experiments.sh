@@ -113,7 +113,7 @@ echo "Generating analysis graphs..."
 echo "========================================="
 
 if command -v python3 &> /dev/null; then
-    python3 /app/scripts/analyze_results.py "$SESSION_DIR"
+    python3 /app/scripts/analyze_client.py "$SESSION_DIR"
     
     if [ $? -eq 0 ]; then
         echo ""